@@ -0,0 +1,324 @@
+"""
+End-to-end benchmark for the task agent:
+IMAP fetch → LLM extract → store_task → CF process_event.
+
+Starts the IMAP and Ollama stand-ins, replays a synthetic mailbox
+through the same stages agent.run_cycle uses, and reports emails/min,
+per-stage latency percentiles, LLM request counts and Mongo round trips.
+
+Needs a reachable MongoDB (MONGO_* settings); results go to a separate
+database (--db, default cto_office_bench) which is wiped first.
+
+    python -m benchmarks.agent_bench --messages 100 --latency lognormal:-1.2,0.5
+    python -m benchmarks.agent_bench --mode serial --failure-rate 0.05
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from benchmarks.email_reader_bench import make_op_counter
+
+BENCH_COLLECTIONS = (
+    "raw_emails",
+    "email_sync_state",
+    "tasks",
+    "context_fingerprints",
+    "event_cf_edges",
+    "llm_extraction_cache",
+    "llm_cache_stats",
+    "llm_tier_stats",
+)
+
+STAGES = ("fetch", "extract", "store", "cf")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="task agent end-to-end benchmark")
+    parser.add_argument("--folders", type=int, default=1)
+    parser.add_argument("--messages", type=int, default=50, help="Messages per folder")
+    parser.add_argument("--body-size", type=int, default=2000)
+    parser.add_argument("--attachment-ratio", type=float, default=0.1)
+    parser.add_argument("--attachment-size", type=int, default=50 * 1024)
+    parser.add_argument("--html-ratio", type=float, default=0.5)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0)
+
+    parser.add_argument("--latency", default="lognormal:-1.6,0.4",
+                        help="Ollama generation latency distribution (see ollama_standin)")
+    parser.add_argument("--per-kchar", type=float, default=0.02,
+                        help="Extra Ollama seconds per 1000 prompt chars")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--empty-ratio", type=float, default=0.4)
+    parser.add_argument("--max-tasks", type=int, default=3)
+    parser.add_argument("--load-seconds", type=float, default=0.0,
+                        help="Simulated model load time on a cold call")
+    parser.add_argument("--keep-alive", default="30m", help="OLLAMA_KEEP_ALIVE for the agent")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="Load the model and prompt prefix before the first poll")
+    parser.add_argument("--classifier-model", help="Enable the model cascade with this classifier")
+    parser.add_argument("--classifier-latency", default="fixed:0.03",
+                        help="Latency distribution of the classifier model")
+
+    parser.add_argument("--mode", choices=["serial", "pipelined"], default="pipelined")
+    parser.add_argument("--extract-workers", type=int, default=2)
+    parser.add_argument("--store-workers", type=int, default=2)
+    parser.add_argument("--cf-workers", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true", help="Disable the LLM extraction cache")
+    parser.add_argument("--no-triage", action="store_true", help="Send every email to the LLM")
+
+    parser.add_argument("--db", default="cto_office_bench", help="Scratch Mongo database")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    return parser.parse_args(argv)
+
+# =========================================================
+# Stats
+# =========================================================
+
+def percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize(stage_stats: dict) -> dict:
+    latencies = stage_stats["latencies"]
+    return {
+        "items": stage_stats["items"],
+        "errors": stage_stats["errors"],
+        "busy_seconds": round(stage_stats["busy_seconds"], 3),
+        **{
+            f"p{pct}_ms": round(percentile(latencies, pct) * 1000, 1) if latencies else None
+            for pct in (50, 90, 99)
+        },
+    }
+
+
+def merge(total: dict, stats: dict):
+    for stage in STAGES:
+        into = total[stage]
+        into["items"] += stats[stage]["items"]
+        into["errors"] += stats[stage].get("errors", 0)
+        into["busy_seconds"] += stats[stage]["busy_seconds"]
+        into["latencies"].extend(stats[stage]["latencies"])
+
+
+def new_stats() -> dict:
+    return {
+        stage: {"items": 0, "errors": 0, "busy_seconds": 0.0, "latencies": []}
+        for stage in STAGES
+    }
+
+# =========================================================
+# Serial Runner (mirrors agent.process_email, timed per stage)
+# =========================================================
+
+def run_serial(emails) -> dict:
+    from src.agents.task_manager.pipeline import extract_stage, store_stage, cf_stage
+
+    stats = new_stats()
+
+    def timed(stage, fn, item):
+        started = time.perf_counter()
+        try:
+            return fn(item)
+        except Exception:
+            stats[stage]["errors"] += 1
+            return []
+        finally:
+            elapsed = time.perf_counter() - started
+            stats[stage]["items"] += 1
+            stats[stage]["busy_seconds"] += elapsed
+            stats[stage]["latencies"].append(elapsed)
+
+    iterator = iter(emails)
+    while True:
+        started = time.perf_counter()
+        try:
+            email = next(iterator)
+        except StopIteration:
+            break
+        elapsed = time.perf_counter() - started
+        stats["fetch"]["items"] += 1
+        stats["fetch"]["busy_seconds"] += elapsed
+        stats["fetch"]["latencies"].append(elapsed)
+
+        for item in timed("extract", extract_stage, email):
+            for stored in timed("store", store_stage, item):
+                timed("cf", cf_stage, stored)
+
+    return stats
+
+# =========================================================
+# Benchmark
+# =========================================================
+
+def run(args):
+    from benchmarks.imap_standin import IMAPStandIn
+    from benchmarks.ollama_standin import OllamaStandIn
+    from benchmarks.mailbox_generator import generate_mailbox
+
+    folder_names = ["INBOX"] + [f"Folder-{i}" for i in range(1, args.folders)]
+
+    mailbox = generate_mailbox(
+        folders=folder_names,
+        messages_per_folder=args.messages,
+        body_size=args.body_size,
+        attachment_ratio=args.attachment_ratio,
+        attachment_size=args.attachment_size,
+        html_ratio=args.html_ratio,
+        duplicate_ratio=args.duplicate_ratio,
+    )
+
+    ollama = OllamaStandIn(
+        latency=args.latency,
+        per_kchar=args.per_kchar,
+        failure_rate=args.failure_rate,
+        empty_ratio=args.empty_ratio,
+        max_tasks=args.max_tasks,
+        load_seconds=args.load_seconds,
+        model_latency=(
+            {args.classifier_model: args.classifier_latency}
+            if args.classifier_model else None
+        ),
+    )
+
+    with IMAPStandIn(mailbox) as imap, ollama:
+        host, port = imap.address
+
+        # Must be in place before src.config is imported
+        os.environ.update({
+            "IMAP_HOST": host,
+            "IMAP_PORT": str(port),
+            "IMAP_SSL": "false",
+            "EMAIL_USER": "bench",
+            "EMAIL_PASS": "bench",
+            "DB_NAME": args.db,
+            "OLLAMA_URL": ollama.url,
+            "OLLAMA_MODEL": os.environ.get("OLLAMA_MODEL", "bench-model"),
+            "LLM_CONCURRENCY": str(max(1, args.extract_workers)),
+            "LLM_CACHE_ENABLED": "false" if args.no_cache else "true",
+            "TRIAGE_ENABLED": "false" if args.no_triage else "true",
+            "OLLAMA_CLASSIFIER_MODEL": args.classifier_model or "",
+            "OLLAMA_KEEP_ALIVE": args.keep_alive,
+        })
+
+        counter = make_op_counter()
+
+        from src.db import get_collection
+        from src.agents.task_manager.email_reader import stream_new_emails
+        from src.agents.task_manager.pipeline import run_pipeline
+
+        for name in BENCH_COLLECTIONS:
+            get_collection(name).drop()
+
+        if args.warm_up:
+            from src.agents.task_manager.task_extractor import warm_up
+            warm_up()
+
+        totals = new_stats()
+        polls = 0
+        counter.reset()
+        started = time.perf_counter()
+
+        while True:
+            progress = {}
+            emails = stream_new_emails(progress)
+
+            if args.mode == "serial":
+                stats = run_serial(emails)
+            else:
+                stats = run_pipeline(
+                    emails,
+                    extract_workers=args.extract_workers,
+                    store_workers=args.store_workers,
+                    cf_workers=args.cf_workers,
+                )
+
+            polls += 1
+            merge(totals, stats)
+
+            if progress.get("exhausted", True) and not stats["fetch"]["items"]:
+                break
+
+        elapsed = time.perf_counter() - started
+        tasks_stored = get_collection("tasks").estimated_document_count()
+
+        from src.agents.task_manager.utils.llm_metrics import tier_stats
+        tiers = tier_stats()
+
+    emails = totals["fetch"]["items"]
+
+    return {
+        "mode": args.mode,
+        "mailbox_messages": sum(len(m) for m in mailbox.values()),
+        "emails": emails,
+        "polls": polls,
+        "seconds": round(elapsed, 3),
+        "emails_per_min": round(emails / elapsed * 60, 1) if elapsed else None,
+        "tasks_stored": tasks_stored,
+        "stages": {stage: summarize(totals[stage]) for stage in STAGES},
+        "llm": {
+            "requests": ollama.requests,
+            "failures": ollama.failures,
+            "aborted_streams": ollama.aborted,
+            "cold_starts": ollama.cold_starts,
+            "prompt_chars": ollama.prompt_chars,
+            "tiers": tiers,
+        },
+        "mongo": {
+            "writes": counter.writes,
+            "reads": counter.reads,
+            "ops_per_email": round((counter.writes + counter.reads) / emails, 1) if emails else None,
+        },
+    }
+
+
+def print_report(report):
+    print(f"\n📊 agent end-to-end benchmark ({report['mode']})\n")
+    print(f"Mailbox          : {report['mailbox_messages']} messages")
+    print(f"Processed        : {report['emails']} emails in {report['polls'] - 1} poll(s), "
+          f"{report['seconds']} s")
+    print(f"Throughput       : {report['emails_per_min']} emails/min")
+    print(f"Tasks stored     : {report['tasks_stored']}")
+
+    llm = report["llm"]
+    print(f"LLM requests     : {llm['requests']} ({llm['failures']} failed, "
+          f"{llm['aborted_streams']} aborted early, {llm['prompt_chars']} prompt chars)")
+
+    for tier in llm["tiers"]:
+        print(f"  [{tier['tier']}] {tier['model']}: {tier['calls']} call(s), "
+              f"avg {tier['avg_seconds']} s | warm {tier['warm_calls']} @ "
+              f"{tier['avg_warm_seconds']} s, cold {tier['cold_calls']} @ "
+              f"{tier['avg_cold_seconds']} s")
+
+    mongo = report["mongo"]
+    print(f"Mongo            : {mongo['writes']} writes, {mongo['reads']} reads "
+          f"({mongo['ops_per_email']} ops/email)\n")
+
+    print(f"{'stage':<8} {'items':>6} {'errors':>6} {'busy s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for stage, s in report["stages"].items():
+        print(
+            f"{stage:<8} {s['items']:>6} {s['errors']:>6} {s['busy_seconds']:>8} "
+            f"{s['p50_ms'] if s['p50_ms'] is not None else '-':>8} "
+            f"{s['p90_ms'] if s['p90_ms'] is not None else '-':>8} "
+            f"{s['p99_ms'] if s['p99_ms'] is not None else '-':>8}"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
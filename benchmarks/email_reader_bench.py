@@ -0,0 +1,195 @@
+"""
+Throughput benchmark for email_reader.fetch_new_emails.
+
+Starts an in-process IMAP stand-in filled with a synthetic mailbox and
+polls it until exhausted (plus one idle poll), reporting per poll:
+messages, wall time, bytes on the wire and Mongo round trips.
+
+Needs a reachable MongoDB (MONGO_* settings); results go to a separate
+database (--db, default cto_office_bench) which is wiped first.
+
+    python -m benchmarks.email_reader_bench --folders 5 --messages 200
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="email_reader throughput benchmark")
+    parser.add_argument("--folders", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=100, help="Messages per folder")
+    parser.add_argument("--body-size", type=int, default=2000)
+    parser.add_argument("--attachment-ratio", type=float, default=0.3)
+    parser.add_argument("--attachment-size", type=int, default=200 * 1024)
+    parser.add_argument("--html-ratio", type=float, default=0.5)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    parser.add_argument("--batch-size", type=int, help="Override email_reader.BATCH_SIZE")
+    parser.add_argument("--pool-size", type=int, help="Override IMAP_POOL_SIZE")
+    parser.add_argument("--db", default="cto_office_bench", help="Scratch Mongo database")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    return parser.parse_args(argv)
+
+# =========================================================
+# Mongo Operation Counter
+# =========================================================
+
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify", "createIndexes"}
+
+
+def make_op_counter():
+    from pymongo import monitoring
+
+    class OpCounter(monitoring.CommandListener):
+        def __init__(self):
+            self._lock = threading.Lock()
+            self.reset()
+
+        def reset(self):
+            with self._lock:
+                self.writes = 0
+                self.reads = 0
+
+        def started(self, event):
+            with self._lock:
+                if event.command_name in WRITE_COMMANDS:
+                    self.writes += 1
+                elif event.command_name in ("find", "aggregate", "count"):
+                    self.reads += 1
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    counter = OpCounter()
+    monitoring.register(counter)
+    return counter
+
+# =========================================================
+# Benchmark
+# =========================================================
+
+def run(args):
+    from benchmarks.imap_standin import IMAPStandIn
+    from benchmarks.mailbox_generator import generate_mailbox, mailbox_size
+
+    folder_names = ["INBOX"] + [f"Folder-{i}" for i in range(1, args.folders - 1)]
+    if args.folders > 1:
+        folder_names.append("All Mail")
+
+    mailbox = generate_mailbox(
+        folders=folder_names,
+        messages_per_folder=args.messages,
+        body_size=args.body_size,
+        attachment_ratio=args.attachment_ratio,
+        attachment_size=args.attachment_size,
+        html_ratio=args.html_ratio,
+        duplicate_ratio=args.duplicate_ratio,
+    )
+
+    with IMAPStandIn(mailbox) as imap:
+        host, port = imap.address
+
+        # Must be in place before src.config is imported
+        os.environ.update({
+            "IMAP_HOST": host,
+            "IMAP_PORT": str(port),
+            "IMAP_SSL": "false",
+            "EMAIL_USER": "bench",
+            "EMAIL_PASS": "bench",
+            "DB_NAME": args.db,
+        })
+
+        counter = make_op_counter()
+
+        from src.db import get_collection
+        from src.agents.task_manager import email_reader
+
+        if args.batch_size:
+            email_reader.BATCH_SIZE = args.batch_size
+        if args.pool_size:
+            email_reader.IMAP_POOL_SIZE = args.pool_size
+
+        for name in ("raw_emails", "email_sync_state"):
+            get_collection(name).drop()
+
+        polls = []
+        while True:
+            imap.reset_counters()
+            counter.reset()
+
+            started = time.perf_counter()
+            result = email_reader.fetch_new_emails()
+            elapsed = time.perf_counter() - started
+
+            polls.append({
+                "emails": len(result["emails"]),
+                "seconds": round(elapsed, 4),
+                "bytes_sent": imap.bytes_sent,
+                "bytes_received": imap.bytes_received,
+                "mongo_writes": counter.writes,
+                "mongo_reads": counter.reads,
+            })
+
+            # Stop after the first poll that finds nothing new
+            if result["exhausted"] and not result["emails"]:
+                break
+
+    busy = polls[:-1] or polls
+    emails = sum(p["emails"] for p in busy)
+    seconds = sum(p["seconds"] for p in busy)
+    wire = sum(p["bytes_sent"] + p["bytes_received"] for p in busy)
+
+    return {
+        "mailbox_messages": sum(len(m) for m in mailbox.values()),
+        "mailbox_bytes": mailbox_size(mailbox),
+        "polls": polls,
+        "emails": emails,
+        "messages_per_sec": round(emails / seconds, 1) if seconds else None,
+        "bytes_transferred": wire,
+        "bytes_per_email": round(wire / emails) if emails else None,
+        "mongo_writes_per_poll": round(
+            sum(p["mongo_writes"] for p in busy) / len(busy), 1
+        ),
+        "idle_poll_seconds": polls[-1]["seconds"],
+    }
+
+
+def print_report(report):
+    print("\n📊 email_reader benchmark\n")
+    print(f"Mailbox          : {report['mailbox_messages']} messages, "
+          f"{report['mailbox_bytes'] / 1e6:.1f} MB")
+    print(f"Ingested         : {report['emails']} emails in {len(report['polls']) - 1} poll(s)")
+    print(f"Throughput       : {report['messages_per_sec']} msg/s")
+    print(f"On the wire      : {report['bytes_transferred'] / 1e6:.2f} MB "
+          f"({report['bytes_per_email']} B/email)")
+    print(f"Mongo writes     : {report['mongo_writes_per_poll']} per poll")
+    print(f"Idle poll        : {report['idle_poll_seconds'] * 1000:.1f} ms\n")
+
+    print(f"{'poll':>4} {'emails':>7} {'sec':>8} {'sent':>10} {'recv':>8} {'writes':>7} {'reads':>6}")
+    for idx, p in enumerate(report["polls"], start=1):
+        print(
+            f"{idx:>4} {p['emails']:>7} {p['seconds']:>8.3f} {p['bytes_sent']:>10} "
+            f"{p['bytes_received']:>8} {p['mongo_writes']:>7} {p['mongo_reads']:>6}"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""
+In-process IMAP4rev1 stand-in for benchmarking the email reader.
+
+Implements just enough of the protocol for IMAPClient and
+email_reader: CAPABILITY, LOGIN, LIST, SELECT/EXAMINE, STATUS,
+(UID) SEARCH, (UID) FETCH with BODYSTRUCTURE / BODY.PEEK[section]<p.n>,
+IDLE/DONE, NOOP, CLOSE/UNSELECT, LOGOUT.
+
+Every byte sent and received is counted so benchmarks can report
+network cost per poll.
+"""
+
+import re
+import select
+import socket
+import threading
+import socketserver
+import email
+import email.policy
+from datetime import datetime, timezone
+
+CAPABILITIES = "IMAP4rev1 IDLE CONDSTORE UIDPLUS UNSELECT"
+
+# =========================================================
+# Mailbox Model
+# =========================================================
+
+class StoredMessage:
+    def __init__(self, uid: int, raw: bytes, internal_date: datetime):
+        self.uid = uid
+        self.raw = raw
+        self.internal_date = internal_date
+        self.msg = email.message_from_bytes(raw, policy=email.policy.compat32)
+
+
+class Folder:
+    def __init__(self, name: str, uidvalidity: int):
+        self.name = name
+        self.uidvalidity = uidvalidity
+        self.uidnext = 1
+        self.modseq = 1
+        self.messages = []
+
+    def append(self, raw: bytes, internal_date: datetime | None = None) -> int:
+        uid = self.uidnext
+        self.uidnext += 1
+        self.modseq += 1
+        self.messages.append(
+            StoredMessage(uid, raw, internal_date or datetime.now(timezone.utc))
+        )
+        return uid
+
+# =========================================================
+# Wire Formatting
+# =========================================================
+
+def _quote(value) -> str:
+    if value is None:
+        return "NIL"
+    if isinstance(value, int):
+        return str(value)
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{value}"'
+
+
+def _params(pairs) -> str:
+    if not pairs:
+        return "NIL"
+    return "(" + " ".join(f"{_quote(k)} {_quote(v)}" for k, v in pairs) + ")"
+
+
+def _part_payload(part) -> bytes:
+    payload = part.get_payload()
+    if isinstance(payload, str):
+        return payload.encode("utf-8", errors="replace")
+    return payload or b""
+
+
+def bodystructure(part) -> str:
+    if part.is_multipart():
+        children = "".join(bodystructure(p) for p in part.get_payload())
+        boundary = part.get_param("boundary")
+        return (
+            f"({children} {_quote(part.get_content_subtype())} "
+            f"{_params([('boundary', boundary)] if boundary else [])} NIL NIL NIL)"
+        )
+
+    maintype = part.get_content_maintype()
+    params = [
+        (k, v) for k, v in (part.get_params() or [])[1:]
+    ]
+    encoding = part.get("Content-Transfer-Encoding", "7bit").lower()
+    payload = _part_payload(part)
+
+    fields = [
+        _quote(maintype),
+        _quote(part.get_content_subtype()),
+        _params(params),
+        "NIL",
+        "NIL",
+        _quote(encoding),
+        str(len(payload)),
+    ]
+    if maintype == "text":
+        fields.append(str(payload.count(b"\n") + 1))
+
+    disposition = part.get_content_disposition()
+    filename = part.get_filename()
+    dsp = "NIL"
+    if disposition:
+        dsp = f"({_quote(disposition)} {_params([('filename', filename)] if filename else [])})"
+
+    # md5, disposition, language, location
+    fields.extend(["NIL", dsp, "NIL", "NIL"])
+    return "(" + " ".join(fields) + ")"
+
+
+def _section(msg: StoredMessage, section: str) -> bytes:
+    section = section.upper()
+
+    if section in ("", "RFC822"):
+        return msg.raw
+    if section == "HEADER":
+        head, _, _ = msg.raw.partition(b"\r\n\r\n")
+        if head == msg.raw:
+            head, _, _ = msg.raw.partition(b"\n\n")
+        return head + b"\r\n\r\n"
+    if section == "TEXT":
+        for sep in (b"\r\n\r\n", b"\n\n"):
+            if sep in msg.raw:
+                return msg.raw.split(sep, 1)[1]
+        return b""
+
+    part = msg.msg
+    for idx in section.split("."):
+        n = int(idx)
+        if part.is_multipart():
+            part = part.get_payload()[n - 1]
+        elif n != 1:
+            return b""
+    return _part_payload(part)
+
+
+def _format_date(dt: datetime) -> str:
+    return dt.strftime("%d-%b-%Y %H:%M:%S %z")
+
+# =========================================================
+# Command Parsing
+# =========================================================
+
+_TOKEN = re.compile(r'\s*(\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+)')
+
+
+def _tokenize(text: str):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match:
+            break
+        token = match.group(1)
+        pos = match.end()
+        if token.startswith('"'):
+            token = re.sub(r"\\(.)", r"\1", token[1:-1])
+        tokens.append(token)
+    return tokens
+
+
+def _parse_set(spec: str, maximum: int):
+    """
+    "1,4:6,9:*" → predicate over ints
+    """
+    ranges = []
+    for chunk in spec.split(","):
+        if ":" in chunk:
+            lo, hi = chunk.split(":")
+            lo = maximum if lo == "*" else int(lo)
+            hi = maximum if hi == "*" else int(hi)
+            ranges.append((min(lo, hi), max(lo, hi)))
+        else:
+            n = maximum if chunk == "*" else int(chunk)
+            ranges.append((n, n))
+    return lambda n: any(lo <= n <= hi for lo, hi in ranges)
+
+# =========================================================
+# Session
+# =========================================================
+
+class _Session(socketserver.BaseRequestHandler):
+
+    def setup(self):
+        self.buffer = b""
+        self.selected = None
+        self.server.standin._sessions.add(self)
+
+    def finish(self):
+        self.server.standin._sessions.discard(self)
+
+    # ---------------- I/O ----------------
+
+    def send(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self.server.standin._count(sent=len(data))
+        self.request.sendall(data)
+
+    def readline(self, timeout=None) -> bytes | None:
+        while b"\r\n" not in self.buffer:
+            if timeout is not None:
+                ready, _, _ = select.select([self.request], [], [], timeout)
+                if not ready:
+                    return None
+            chunk = self.request.recv(65536)
+            if not chunk:
+                raise ConnectionError("client closed")
+            self.server.standin._count(received=len(chunk))
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b"\r\n", 1)
+        return line
+
+    def read_command(self) -> str:
+        """
+        Read one command line, resolving {n} literals.
+        """
+        line = self.readline()
+        while True:
+            match = re.search(rb"\{(\d+)\}$", line)
+            if not match:
+                return line.decode(errors="replace")
+            size = int(match.group(1))
+            self.send("+ go ahead\r\n")
+            while len(self.buffer) < size:
+                chunk = self.request.recv(65536)
+                if not chunk:
+                    raise ConnectionError("client closed")
+                self.server.standin._count(received=len(chunk))
+                self.buffer += chunk
+            literal, self.buffer = self.buffer[:size], self.buffer[size:]
+            rest = self.readline()
+            line = line[:match.start()] + b'"' + literal.replace(b'"', b'\\"') + b'"' + rest
+
+    # ---------------- Loop ----------------
+
+    def handle(self):
+        self.send(f"* OK [CAPABILITY {CAPABILITIES}] IMAP stand-in ready\r\n")
+        try:
+            while True:
+                tokens = _tokenize(self.read_command())
+                if len(tokens) < 2:
+                    continue
+                tag, command, args = tokens[0], tokens[1].upper(), tokens[2:]
+                if command == "UID":
+                    command, args, uid_mode = args[0].upper(), args[1:], True
+                else:
+                    uid_mode = False
+
+                handler = getattr(self, f"cmd_{command.lower()}", None)
+                if handler is None:
+                    self.send(f"{tag} BAD unsupported command {command}\r\n")
+                    continue
+
+                if handler(tag, args, uid_mode) is False:
+                    return
+        except (ConnectionError, OSError):
+            return
+
+    # ---------------- Commands ----------------
+
+    def cmd_capability(self, tag, args, uid_mode):
+        self.send(f"* CAPABILITY {CAPABILITIES}\r\n{tag} OK CAPABILITY completed\r\n")
+
+    def cmd_login(self, tag, args, uid_mode):
+        self.send(f"{tag} OK [CAPABILITY {CAPABILITIES}] LOGIN completed\r\n")
+
+    def cmd_logout(self, tag, args, uid_mode):
+        self.send(f"* BYE logging out\r\n{tag} OK LOGOUT completed\r\n")
+        return False
+
+    def cmd_noop(self, tag, args, uid_mode):
+        self.send(f"{tag} OK NOOP completed\r\n")
+
+    def cmd_enable(self, tag, args, uid_mode):
+        self.send(f"* ENABLED\r\n{tag} OK ENABLE completed\r\n")
+
+    def cmd_list(self, tag, args, uid_mode):
+        lines = "".join(
+            f'* LIST (\\HasNoChildren) "/" {_quote(name)}\r\n'
+            for name in self.server.standin.folders
+        )
+        self.send(f"{lines}{tag} OK LIST completed\r\n")
+
+    def _folder(self, name):
+        return self.server.standin.folders.get(name)
+
+    def cmd_select(self, tag, args, uid_mode, readonly=False):
+        folder = self._folder(args[0]) if args else None
+        if folder is None:
+            self.send(f"{tag} NO no such folder\r\n")
+            return
+        self.selected = folder
+        mode = "READ-ONLY" if readonly else "READ-WRITE"
+        self.send(
+            "* FLAGS (\\Seen \\Answered \\Flagged \\Deleted \\Draft)\r\n"
+            f"* {len(folder.messages)} EXISTS\r\n"
+            "* 0 RECENT\r\n"
+            f"* OK [UIDVALIDITY {folder.uidvalidity}] UIDs valid\r\n"
+            f"* OK [UIDNEXT {folder.uidnext}] Predicted next UID\r\n"
+            f"* OK [HIGHESTMODSEQ {folder.modseq}] Highest\r\n"
+            f"{tag} OK [{mode}] SELECT completed\r\n"
+        )
+
+    def cmd_examine(self, tag, args, uid_mode):
+        return self.cmd_select(tag, args, uid_mode, readonly=True)
+
+    def cmd_close(self, tag, args, uid_mode):
+        self.selected = None
+        self.send(f"{tag} OK CLOSE completed\r\n")
+
+    cmd_unselect = cmd_close
+
+    def cmd_status(self, tag, args, uid_mode):
+        folder = self._folder(args[0]) if args else None
+        if folder is None:
+            self.send(f"{tag} NO no such folder\r\n")
+            return
+        values = {
+            "MESSAGES": len(folder.messages),
+            "RECENT": 0,
+            "UIDNEXT": folder.uidnext,
+            "UIDVALIDITY": folder.uidvalidity,
+            "UNSEEN": 0,
+            "HIGHESTMODSEQ": folder.modseq,
+        }
+        items = [a.upper() for a in args[1:] if a not in ("(", ")")]
+        body = " ".join(f"{item} {values[item]}" for item in items if item in values)
+        self.send(f"* STATUS {_quote(folder.name)} ({body})\r\n{tag} OK STATUS completed\r\n")
+
+    def cmd_search(self, tag, args, uid_mode):
+        if self.selected is None:
+            self.send(f"{tag} NO no folder selected\r\n")
+            return
+
+        messages = list(enumerate(self.selected.messages, start=1))
+        max_uid = messages[-1][1].uid if messages else 0
+        criteria = [a for a in args if a not in ("(", ")")]
+
+        i = 0
+        while i < len(criteria):
+            key = criteria[i].upper()
+            if key == "CHARSET":
+                i += 2
+                continue
+            if key == "UID":
+                match = _parse_set(criteria[i + 1], max_uid)
+                messages = [(seq, m) for seq, m in messages if match(m.uid)]
+                i += 2
+                continue
+            if key == "SINCE":
+                since = datetime.strptime(criteria[i + 1], "%d-%b-%Y").date()
+                messages = [
+                    (seq, m) for seq, m in messages
+                    if m.internal_date.date() >= since
+                ]
+                i += 2
+                continue
+            i += 1
+
+        ids = " ".join(str(m.uid if uid_mode else seq) for seq, m in messages)
+        self.send(f"* SEARCH {ids}".rstrip() + f"\r\n{tag} OK SEARCH completed\r\n")
+
+    def cmd_fetch(self, tag, args, uid_mode):
+        if self.selected is None:
+            self.send(f"{tag} NO no folder selected\r\n")
+            return
+
+        messages = self.selected.messages
+        max_id = (messages[-1].uid if uid_mode else len(messages)) if messages else 0
+        match = _parse_set(args[0], max_id)
+        items = [a for a in args[1:] if a not in ("(", ")")]
+
+        out = []
+        for seq, msg in enumerate(messages, start=1):
+            if not match(msg.uid if uid_mode else seq):
+                continue
+
+            parts = [f"UID {msg.uid}".encode()]
+            for item in items:
+                upper = item.upper()
+                if upper == "UID":
+                    continue
+                if upper == "FLAGS":
+                    parts.append(b"FLAGS ()")
+                elif upper == "INTERNALDATE":
+                    parts.append(f'INTERNALDATE "{_format_date(msg.internal_date)}"'.encode())
+                elif upper == "RFC822.SIZE":
+                    parts.append(f"RFC822.SIZE {len(msg.raw)}".encode())
+                elif upper in ("BODYSTRUCTURE", "BODY"):
+                    parts.append(f"BODYSTRUCTURE {bodystructure(msg.msg)}".encode())
+                elif upper == "RFC822":
+                    parts.append(b"RFC822 {%d}\r\n" % len(msg.raw) + msg.raw)
+                elif upper.startswith("BODY"):
+                    m = re.match(r"BODY(?:\.PEEK)?\[([^\]]*)\](?:<(\d+)(?:\.(\d+))?>)?", upper)
+                    if not m:
+                        continue
+                    section, origin, length = m.group(1), m.group(2), m.group(3)
+                    data = _section(msg, section)
+                    key = f"BODY[{section}]"
+                    if origin is not None:
+                        start = int(origin)
+                        data = data[start:start + int(length)] if length else data[start:]
+                        key += f"<{start}>"
+                    parts.append(f"{key} {{{len(data)}}}\r\n".encode() + data)
+
+            out.append(b"* %d FETCH (" % seq + b" ".join(parts) + b")\r\n")
+
+        self.send(b"".join(out) + f"{tag} OK FETCH completed\r\n".encode())
+
+    def cmd_idle(self, tag, args, uid_mode):
+        folder = self.selected
+        seen = len(folder.messages) if folder else 0
+        self.send("+ idling\r\n")
+
+        while True:
+            line = self.readline(timeout=0.2)
+            if line is not None:
+                break
+            if folder is not None and len(folder.messages) != seen:
+                seen = len(folder.messages)
+                self.send(f"* {seen} EXISTS\r\n")
+
+        self.send(f"{tag} OK IDLE terminated\r\n")
+
+# =========================================================
+# Server
+# =========================================================
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class IMAPStandIn:
+    """
+    Usage:
+        with IMAPStandIn(mailbox) as imap:
+            host, port = imap.address
+    `mailbox` is { folder: [(raw_bytes, internal_date), ...] }.
+    """
+
+    def __init__(self, mailbox=None, host="127.0.0.1", port=0):
+        self.folders = {}
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+        for idx, (name, messages) in enumerate((mailbox or {}).items(), start=1):
+            folder = self.add_folder(name, uidvalidity=idx)
+            for raw, internal_date in messages:
+                folder.append(raw, internal_date)
+
+        self._server = _Server((host, port), _Session)
+        self._server.standin = self
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    def add_folder(self, name: str, uidvalidity: int | None = None) -> Folder:
+        folder = Folder(name, uidvalidity or len(self.folders) + 1)
+        self.folders[name] = folder
+        return folder
+
+    def append(self, folder: str, raw: bytes, internal_date=None) -> int:
+        """
+        Deliver a new message; IDLE sessions on the folder see EXISTS.
+        """
+        return self.folders[folder].append(raw, internal_date)
+
+    def reset_counters(self):
+        with self._lock:
+            self.bytes_sent = 0
+            self.bytes_received = 0
+
+    def _count(self, sent=0, received=0):
+        with self._lock:
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="imap-standin",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        for session in list(self._sessions):
+            try:
+                session.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,128 @@
+"""
+Synthetic mailbox generator for reader benchmarks.
+
+Produces { folder: [(raw_bytes, internal_date), ...] } with a
+configurable mix of plain/HTML bodies, attachments and cross-folder
+copies (the same Message-ID filed in INBOX and "All Mail").
+"""
+
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import format_datetime, make_msgid
+
+WORDS = (
+    "please review the proposal budget deploy soc alert approve policy "
+    "meeting tomorrow deadline contract vendor hiring interview update "
+    "report incident analysis finalize schedule follow up share draft"
+).split()
+
+SENDERS = [
+    ("Asha Rao", "asha@example.org"),
+    ("Vikram Singh", "vikram@example.org"),
+    ("SOC Alerts", "no-reply@alerts.example.org"),
+    ("Newsletter", "news@lists.example.com"),
+]
+
+
+def _text(rng: random.Random, size: int) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+        if rng.random() < 0.08:
+            words.append("\n")
+    return " ".join(words)
+
+
+def make_message(
+    rng: random.Random,
+    *,
+    body_size: int,
+    attachments: int,
+    attachment_size: int,
+    html: bool,
+    sent_at: datetime,
+    message_id: str | None = None,
+) -> bytes:
+    name, addr = rng.choice(SENDERS)
+
+    msg = EmailMessage()
+    msg["From"] = f"{name} <{addr}>"
+    msg["To"] = "cto@example.org"
+    msg["Subject"] = " ".join(rng.choice(WORDS) for _ in range(6)).capitalize()
+    msg["Date"] = format_datetime(sent_at)
+    msg["Message-ID"] = message_id or make_msgid(domain="example.org")
+
+    text = _text(rng, body_size)
+    msg.set_content(text)
+    if html:
+        msg.add_alternative(f"<html><body><p>{text}</p></body></html>", subtype="html")
+
+    for idx in range(attachments):
+        msg.add_attachment(
+            os.urandom(attachment_size),
+            maintype="application",
+            subtype="pdf",
+            filename=f"attachment-{idx + 1}.pdf",
+        )
+
+    return msg.as_bytes()
+
+
+def generate_mailbox(
+    *,
+    folders=("INBOX", "Projects", "All Mail"),
+    messages_per_folder: int = 100,
+    body_size: int = 2000,
+    attachment_ratio: float = 0.3,
+    attachments_per_message: int = 2,
+    attachment_size: int = 200 * 1024,
+    html_ratio: float = 0.5,
+    duplicate_ratio: float = 0.3,
+    seed: int = 42,
+):
+    """
+    Returns:
+        dict: { folder: [(raw_bytes, internal_date), ...] }
+
+    `duplicate_ratio` of each later folder is copies of messages from
+    the first folder (same Message-ID), mimicking Gmail labels.
+    """
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    mailbox = {}
+    originals = []
+
+    for f_idx, folder in enumerate(folders):
+        messages = []
+        for i in range(messages_per_folder):
+            if f_idx > 0 and originals and rng.random() < duplicate_ratio:
+                messages.append(rng.choice(originals))
+                continue
+
+            sent_at = start + timedelta(minutes=rng.randint(0, 30 * 24 * 60))
+            raw = make_message(
+                rng,
+                body_size=body_size,
+                attachments=attachments_per_message if rng.random() < attachment_ratio else 0,
+                attachment_size=attachment_size,
+                html=rng.random() < html_ratio,
+                sent_at=sent_at,
+            )
+            entry = (raw, sent_at + timedelta(seconds=rng.randint(1, 120)))
+            messages.append(entry)
+            if f_idx == 0:
+                originals.append(entry)
+
+        messages.sort(key=lambda entry: entry[1])
+        mailbox[folder] = messages
+
+    return mailbox
+
+
+def mailbox_size(mailbox) -> int:
+    return sum(len(raw) for messages in mailbox.values() for raw, _ in messages)
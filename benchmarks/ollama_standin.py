@@ -0,0 +1,323 @@
+"""
+In-process stand-in for the Ollama /api/generate endpoint.
+
+Answers extraction prompts with canned task JSON after a simulated
+generation delay, so the agent can be load-tested without a model:
+
+- latency: a distribution spec (see parse_latency), plus an optional
+  cost per 1000 prompt characters
+- failure_rate: share of requests answered with HTTP 500
+- empty_ratio: share of prompts answered with EMPTY
+- max_tasks: 1..N tasks per non-empty answer, derived from the prompt
+  so the same email always gets the same answer
+
+Cascade classifier prompts (asking for {"actionable": ...}) get a
+verdict consistent with the canned extraction answer. Per-model latency
+can be set with `model_latency` (e.g. a fast classifier model).
+
+Model residency is simulated too: a model not used within its
+keep_alive (request field, default 5m) pays `load_seconds` on the next
+call, and a loaded model only pays `per_kchar` for the part of the
+prompt after the prefix it shares with the previous prompt (KV cache
+reuse). Responses carry Ollama's load/prompt-eval durations and counts.
+
+Both "stream": false (one JSON body) and "stream": true (NDJSON chunks
+spread over the generation time) are supported. Batched prompts
+("### EMAIL <key>" sections) get a JSON object keyed by email.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import os
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUBJECT_RE = re.compile(r"^Subject: (.*)$", re.MULTILINE)
+BATCH_SECTION_RE = re.compile(r"^### EMAIL (\S+)\nSubject: (.*)$", re.MULTILINE)
+
+TASK_VERBS = ["Review", "Approve", "Share", "Schedule", "Finalize", "Follow up on"]
+
+# Characters per streamed chunk (roughly one token)
+STREAM_CHUNK_CHARS = 4
+
+DEFAULT_KEEP_ALIVE = "5m"
+
+
+def keep_alive_seconds(value) -> float:
+    value = str(value if value is not None else DEFAULT_KEEP_ALIVE).strip().lower()
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    seconds = float(value)
+    return float("inf") if seconds < 0 else seconds
+
+
+def parse_latency(spec: str):
+    """
+    "fixed:0.3" | "uniform:0.1,0.5" | "normal:0.3,0.05"
+    | "lognormal:-1.2,0.5" | "exp:0.3"  →  callable(rng) -> seconds
+    """
+    kind, _, raw = spec.partition(":")
+    params = [float(p) for p in raw.split(",") if p]
+
+    makers = {
+        "fixed": lambda rng: params[0],
+        "uniform": lambda rng: rng.uniform(params[0], params[1]),
+        "normal": lambda rng: max(0.0, rng.gauss(params[0], params[1])),
+        "lognormal": lambda rng: rng.lognormvariate(params[0], params[1]),
+        "exp": lambda rng: rng.expovariate(1 / params[0]),
+    }
+    if kind not in makers:
+        raise ValueError(f"Unknown latency distribution: {spec}")
+
+    return makers[kind]
+
+# =========================================================
+# Canned Answers
+# =========================================================
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def canned_tasks(subject: str, empty_ratio: float, max_tasks: int) -> list:
+    rng = random.Random(_seed(subject))
+    if rng.random() < empty_ratio:
+        return []
+
+    tasks = []
+    for n in range(rng.randint(1, max(1, max_tasks))):
+        title = f"{rng.choice(TASK_VERBS)} {subject}".strip()[:120]
+        tasks.append({
+            "title": f"{title} ({n + 1})" if n else title,
+            "owner": rng.choice(["Ras", "Asha", "Vikram", "SOC team"]),
+            "due_by": None,
+            "institutional": rng.random() < 0.2,
+            "blocks_others": rng.random() < 0.3,
+            "external_dependency": rng.random() < 0.2,
+            "delegatable": rng.random() < 0.5,
+        })
+
+    return tasks
+
+
+def answer(prompt: str, empty_ratio: float, max_tasks: int) -> str:
+    if '"actionable"' in prompt:
+        match = SUBJECT_RE.search(prompt)
+        tasks = canned_tasks(match.group(1) if match else prompt, empty_ratio, max_tasks)
+        return json.dumps({"actionable": bool(tasks), "confidence": 0.9})
+
+    sections = BATCH_SECTION_RE.findall(prompt)
+    if sections:
+        return json.dumps({
+            key: canned_tasks(subject, empty_ratio, max_tasks)
+            for key, subject in sections
+        })
+
+    match = SUBJECT_RE.search(prompt)
+    tasks = canned_tasks(match.group(1) if match else prompt, empty_ratio, max_tasks)
+    return json.dumps(tasks) if tasks else "EMPTY"
+
+# =========================================================
+# HTTP Server
+# =========================================================
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        standin = self.server.standin
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.rstrip("/") != "/api/generate":
+            self._send(404, {"error": "not found"})
+            return
+
+        prompt = request.get("prompt", "")
+        plan = standin._plan(prompt, request.get("model"), request.get("keep_alive"))
+
+        if plan["fail"]:
+            time.sleep(plan["generation"] / 10)
+            self._send(500, {"error": "simulated failure"})
+            return
+
+        text = answer(prompt, standin.empty_ratio, standin.max_tasks)
+        usage = {**plan["usage"], "eval_count": max(1, len(text) // STREAM_CHUNK_CHARS)}
+
+        # Model load + prompt evaluation happen before the first token
+        time.sleep(plan["first_token"])
+
+        if not request.get("stream", True):
+            time.sleep(plan["generation"])
+            self._send(200, {
+                "model": request.get("model"),
+                "response": text,
+                "done": True,
+                **usage
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        chunks = [
+            text[i:i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(text), STREAM_CHUNK_CHARS)
+        ] or [""]
+        pause = plan["generation"] / len(chunks)
+
+        try:
+            for idx, chunk in enumerate(chunks):
+                time.sleep(pause)
+                last = idx == len(chunks) - 1
+                payload = {"response": chunk, "done": last, **(usage if last else {})}
+                data = (json.dumps(payload) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+                standin._count(chunks=1)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped the generation early
+            standin._count(aborted=1)
+            self.close_connection = True
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients drop keep-alive connections after aborting a stream
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class OllamaStandIn:
+    """
+    Usage:
+        with OllamaStandIn(latency="lognormal:-1.2,0.5") as ollama:
+            os.environ["OLLAMA_URL"] = ollama.url
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: str = "fixed:0.2",
+        per_kchar: float = 0.0,
+        failure_rate: float = 0.0,
+        empty_ratio: float = 0.4,
+        max_tasks: int = 3,
+        model_latency: dict | None = None,
+        load_seconds: float = 0.0,
+        seed: int = 7,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.latency = parse_latency(latency)
+        self.model_latency = {
+            model: parse_latency(spec) for model, spec in (model_latency or {}).items()
+        }
+        self.per_kchar = per_kchar
+        self.load_seconds = load_seconds
+        self._models = {}
+        self.failure_rate = failure_rate
+        self.empty_ratio = empty_ratio
+        self.max_tasks = max_tasks
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_counters()
+
+        self._server = _Server((host, port), _Handler)
+        self._server.standin = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def _plan(self, prompt: str, model: str | None = None, keep_alive=None):
+        with self._lock:
+            now = time.monotonic()
+            state = self._models.setdefault(model, {"loaded_until": 0.0, "last_prompt": ""})
+
+            cold = now >= state["loaded_until"]
+            load = self.load_seconds if cold else 0.0
+            reused = 0 if cold else len(os.path.commonprefix([state["last_prompt"], prompt]))
+            prompt_eval = self.per_kchar * (len(prompt) - reused) / 1000
+
+            latency = self.model_latency.get(model, self.latency)
+            generation = latency(self._rng)
+            fail = self._rng.random() < self.failure_rate
+
+            state["last_prompt"] = prompt
+            state["loaded_until"] = (
+                now + load + prompt_eval + generation + keep_alive_seconds(keep_alive)
+            )
+
+            self.requests += 1
+            self.failures += int(fail)
+            self.prompt_chars += len(prompt)
+            self.cold_starts += int(cold)
+
+        return {
+            "fail": fail,
+            "first_token": load + prompt_eval,
+            "generation": generation,
+            "usage": {
+                "load_duration": int(load * 1e9),
+                "prompt_eval_count": max(1, (len(prompt) - reused) // STREAM_CHUNK_CHARS),
+                "prompt_eval_duration": int(prompt_eval * 1e9),
+            },
+        }
+
+    def _count(self, chunks=0, aborted=0):
+        with self._lock:
+            self.chunks += chunks
+            self.aborted += aborted
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.failures = 0
+            self.prompt_chars = 0
+            self.chunks = 0
+            self.aborted = 0
+            self.cold_starts = 0
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="ollama-standin",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
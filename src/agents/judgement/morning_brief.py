@@ -61,7 +61,8 @@ def _email_context(task):
 
 
 def get_open_tasks():
-    return list(tasks_col.find({"status": "OPEN"}))
+    # Linked near-duplicates are briefed through their canonical task
+    return list(tasks_col.find({"status": "OPEN", "duplicate_of": None}))
 
 
 # -------------------------
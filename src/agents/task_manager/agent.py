@@ -1,12 +1,26 @@
 import time
 import logging
-from datetime import datetime, timezone
-
-from src.agents.task_manager.email_reader import fetch_new_emails
-from src.agents.task_manager.task_extractor import extract_tasks
-from src.agents.task_manager.task_store import store_task
-from src.agents.task_manager.utils.cf_engine import process_event
-from src.config.config import EMAIL_POLL_SECONDS
+import threading
+
+from src.db import ensure_indexes
+from src.agents.task_manager.email_reader import stream_new_emails
+from src.agents.task_manager import work_queue
+from src.agents.task_manager.utils.llm_client import get_llm_client
+from src.agents.task_manager.task_extractor import ensure_warm
+from src.agents.task_manager.mail_watcher import MailboxWatcher, server_supports_idle
+from src.agents.task_manager.pipeline import (
+    extract_stage,
+    process_extracted,
+    run_pipeline,
+    run_batched,
+)
+from src.config.config import (
+    EMAIL_POLL_SECONDS,
+    EMAIL_INGEST_MODE,
+    EMAIL_PIPELINE,
+    IMAP_IDLE_FOLDERS,
+    WORK_QUEUE_ENABLED,
+)
 
 
 # ---------- LOGGING SETUP ----------
@@ -26,100 +40,101 @@ LONG_SLEEP = 2 * 60 * 60        # 2 hours
 SHORT_SLEEP = EMAIL_POLL_SECONDS
 
 
-# ---------- AGENT LOOP ----------
-def run_agent():
-    logger.info("📥 Email Task Agent started (CF-aware)")
+# ---------- EMAIL PIPELINE ----------
+def process_email(email):
+    """
+    Extract, store and CF-link the tasks of a single email (serially).
+    """
+    try:
+        extracted = extract_stage(email)
+    except Exception:
+        logger.exception(
+            "❌ Unable to extract tasks from email UID=%s",
+            email.get("uid")
+        )
+        return
+
+    for _, tasks in extracted:
+        process_extracted(email, tasks)
+
+
+def run_cycle():
+    """
+    One fetch + process pass. Emails are streamed, so extraction starts
+    as soon as the first one is parsed instead of after the whole batch.
+
+    With EMAIL_PIPELINE=pipelined, fetch / extract / store / CF run as
+    concurrent stages with bounded queues between them.
+
+    With EMAIL_PIPELINE=batched, short emails are extracted several per
+    LLM prompt (extract_tasks_batch), one window of emails at a time.
+
+    With WORK_QUEUE_ENABLED, fetched emails only become pending work
+    items; they are then drained from the Mongo queue (leases, retries).
+
+    Returns:
+        bool | None: exhausted flag, or None if the fetch failed
+    """
+    progress = {}
+
+    # Don't pull more mail while Ollama is down; it would only queue up
+    breaker = get_llm_client().breaker
+    if breaker.is_open:
+        logger.warning("⏸️ Ollama unavailable; waiting before fetching new emails")
+        breaker.wait_closed()
+
+    # Reload the model (if keep-alive lapsed) while IMAP is fetching
+    ensure_warm()
+
+    try:
+        logger.debug("Fetching new emails")
+        if WORK_QUEUE_ENABLED:
+            # Fetched emails are persisted as pending work; any agent
+            # process may pick them up
+            count = sum(1 for _ in stream_new_emails(progress))
+        elif EMAIL_PIPELINE == "pipelined":
+            stats = run_pipeline(stream_new_emails(progress))
+            count = stats["fetch"]["items"]
+        elif EMAIL_PIPELINE == "batched":
+            count = run_batched(stream_new_emails(progress))
+        else:
+            count = 0
+            for email in stream_new_emails(progress):
+                count += 1
+                process_email(email)
+    except Exception:
+        logger.exception("❌ Failed to fetch emails")
+        return None
+
+    exhausted = progress.get("exhausted", True)
+
+    logger.info(
+        "Fetched %d email(s) | exhausted=%s",
+        count,
+        exhausted
+    )
 
-    while True:
+    if WORK_QUEUE_ENABLED:
+        # Also picks up retries and leases expired on crashed workers
         try:
-            logger.debug("Fetching new emails")
-            result = fetch_new_emails()
+            processed = work_queue.drain()
+            logger.info("Processed %d queued email(s)", processed)
         except Exception:
-            logger.exception("❌ Failed to fetch emails")
-            time.sleep(SHORT_SLEEP)
-            continue
+            logger.exception("❌ Failed to drain work queue")
 
-        emails = result.get("emails", [])
-        exhausted = result.get("exhausted", True)
+    return exhausted
 
-        logger.info(
-            "Fetched %d email(s) | exhausted=%s",
-            len(emails),
-            exhausted
-        )
 
-        for email in emails:
-            uid = email.get("uid")
-
-            # 🔑 Email receipt time (SOURCE OF TRUTH)
-            email_received_at = email.get("received_at")
-
-            # Fallback (should rarely happen)
-            if not email_received_at:
-                email_received_at = datetime.utcnow().replace(tzinfo=timezone.utc)
-
-            try:
-                logger.info("Processing email UID=%s", uid)
-                tasks = extract_tasks(email)
-            except Exception:
-                logger.exception(
-                    "❌ Unable to extract tasks from email UID=%s",
-                    uid
-                )
-                continue
-
-            if not tasks:
-                logger.info(
-                    "No actionable tasks found for email UID=%s",
-                    uid
-                )
-                continue
-
-            for task in tasks:
-                try:
-                    # ----------------------------------------
-                    # 🔑 Set task origin time = email received time
-                    # ----------------------------------------
-                    task["created_at"] = email_received_at.isoformat()
-                    task["last_activity_at"] = email_received_at.isoformat()
-
-                    # ----------------------------------------
-                    # Store task (identity owned by task_store)
-                    # ----------------------------------------
-                    store_task(task)
-                    task_id = task.get("task_id")
-
-                    logger.info(
-                        "📝 Stored task '%s' (task_id=%s) from email UID=%s",
-                        task.get("title"),
-                        task_id,
-                        uid
-                    )
-
-                    # ----------------------------------------
-                    # Emit TASK event to CF engine
-                    # Use email time, not now()
-                    # ----------------------------------------
-                    if task_id:
-                        process_event(
-                            event_id=task_id,
-                            event_type="task",
-                            event_text=task.get("title", ""),
-                            now=email_received_at
-                        )
-                    else:
-                        logger.warning(
-                            "⚠️ Skipping CF event for task without task_id (email UID=%s)",
-                            uid
-                        )
-
-                except Exception:
-                    logger.exception(
-                        "❌ Failed to process task from email UID=%s",
-                        uid
-                    )
-
-        if exhausted:
+# ---------- AGENT LOOP (POLLING) ----------
+def run_agent():
+    logger.info("📥 Email Task Agent started (CF-aware)")
+
+    while True:
+        exhausted = run_cycle()
+
+        if exhausted is None:
+            time.sleep(SHORT_SLEEP)
+        elif exhausted:
             logger.info("📭 Inbox fully processed. Sleeping for 2 hours.")
             time.sleep(LONG_SLEEP)
         else:
@@ -127,8 +142,65 @@ def run_agent():
             time.sleep(SHORT_SLEEP)
 
 
+# ---------- AGENT LOOP (IMAP IDLE PUSH) ----------
+def run_agent_push():
+    """
+    Wake the pipeline as soon as IDLE reports new mail.
+    LONG_SLEEP remains as a safety-net poll interval.
+    Falls back to run_agent() when the server lacks IDLE.
+    """
+    try:
+        supported = server_supports_idle()
+    except Exception:
+        logger.exception("❌ IDLE capability probe failed; using polling")
+        supported = False
+
+    if not supported:
+        logger.warning("⚠️ IMAP IDLE unavailable. Falling back to polling.")
+        return run_agent()
+
+    logger.info(
+        "📥 Email Task Agent started (IDLE push on %s)",
+        ", ".join(IMAP_IDLE_FOLDERS)
+    )
+
+    wake = threading.Event()
+    watcher = MailboxWatcher(IMAP_IDLE_FOLDERS, wake)
+    watcher.start()
+
+    # Catch up on anything that arrived while we were down
+    wake.set()
+    timeout = 0
+
+    try:
+        while True:
+            wake.wait(timeout=timeout)
+            wake.clear()
+
+            if watcher.unsupported.is_set():
+                logger.warning("⚠️ IMAP IDLE rejected. Falling back to polling.")
+                watcher.stop()
+                return run_agent()
+
+            exhausted = run_cycle()
+
+            if exhausted:
+                logger.info("📭 Inbox fully processed. Waiting for new mail.")
+                timeout = LONG_SLEEP
+            else:
+                logger.info("📨 Pending backlog detected. Continuing shortly.")
+                timeout = SHORT_SLEEP
+    finally:
+        watcher.stop()
+
+
 def main():
-    run_agent()
+    ensure_indexes()
+
+    if EMAIL_INGEST_MODE == "idle":
+        run_agent_push()
+    else:
+        run_agent()
 
 
 if __name__ == "__main__":
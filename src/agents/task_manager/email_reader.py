@@ -1,10 +1,28 @@
-from imapclient import IMAPClient
 import pyzmail
+import base64
+import hashlib
+import html
+import logging
+import quopri
+import re
 import email.utils
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime, timezone
+from functools import partial
+from queue import Queue, Full
+from threading import Event
 
-from src.config.config import IMAP_HOST, EMAIL_USER, EMAIL_PASS
-from src.db import get_collection
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from src.config.config import IMAP_POOL_SIZE
+from src.db import get_collection, ensure_indexes
+from src.agents.task_manager import work_queue
+from src.agents.task_manager.utils import triage, threads
+from src.agents.task_manager.utils.body_reducer import reduce_body
+from src.agents.task_manager.utils.imap_pool import IMAPConnectionPool
+
+logger = logging.getLogger("agent.task_manager.email_reader")
 
 # =========================================================
 # Configuration
@@ -13,6 +31,32 @@ from src.db import get_collection
 BATCH_SIZE = 10
 IGNORED_FOLDERS = {}
 
+# Characters of body text kept on the email document
+BODY_MAX_CHARS = 5000
+
+# Bytes of the text part pulled from the server (partial fetch)
+BODY_FETCH_BYTES = 16 * 1024
+
+# Phase 1: structure + headers only (no body, no attachments)
+HEADER_FETCH_ITEMS = ["BODYSTRUCTURE", "BODY.PEEK[HEADER]", "INTERNALDATE"]
+
+# Headers kept on the raw_emails doc (lower-cased), used by triage
+CAPTURED_HEADERS = (
+    "list-unsubscribe",
+    "list-id",
+    "auto-submitted",
+    "precedence",
+    "x-auto-response-suppress",
+)
+
+# Change detection: one STATUS per folder instead of SELECT + SEARCH
+STATUS_ITEMS = ["UIDNEXT", "UIDVALIDITY"]
+
+# Streaming: UIDs per fetch round trip, and parsed emails buffered
+# ahead of the consumer. Together they cap memory regardless of BATCH_SIZE.
+STREAM_CHUNK_SIZE = 5
+STREAM_QUEUE_SIZE = 10
+
 # =========================================================
 # DB Collections
 # =========================================================
@@ -36,6 +80,21 @@ def update_last_uid(folder: str, uid: int):
         upsert=True
     )
 
+
+def load_sync_states() -> dict:
+    """
+    All folder checkpoints in one round trip: { folder: state_doc }
+    """
+    return {doc["folder"]: doc for doc in state_col.find({})}
+
+
+def update_sync_state(folder: str, **fields):
+    state_col.update_one(
+        {"folder": folder},
+        {"$set": fields},
+        upsert=True
+    )
+
 # =========================================================
 # Folder Discovery
 # =========================================================
@@ -56,91 +115,678 @@ def list_inbox_folders(server):
 
     return folders
 
+# =========================================================
+# BODYSTRUCTURE Helpers
+# =========================================================
+
+def _lower(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        value = value.decode(errors="ignore")
+    return str(value).lower()
+
+
+def _structure_params(params) -> dict:
+    """
+    BODYSTRUCTURE params come as a flat (key, value, key, value) tuple.
+    """
+    if not params or not isinstance(params, (list, tuple)):
+        return {}
+
+    return {
+        _lower(params[i]): _lower(params[i + 1])
+        for i in range(0, len(params) - 1, 2)
+    }
+
+
+def _is_attachment(part) -> bool:
+    # Single-part text layout: type, subtype, params, id, desc,
+    # encoding, size, lines, md5, disposition, ...
+    try:
+        disposition = part[9]
+    except (IndexError, TypeError):
+        return False
+
+    if not disposition or not isinstance(disposition, (list, tuple)):
+        return False
+
+    return _lower(disposition[0]) == "attachment"
+
+
+def _walk_text_parts(structure, prefix=""):
+    """
+    Yield (part_id, part) for every non-attachment text/* leaf.
+    Does not descend into attached message/rfc822 parts.
+    """
+    if structure.is_multipart:
+        for idx, child in enumerate(structure[0], start=1):
+            part_id = f"{prefix}.{idx}" if prefix else str(idx)
+            yield from _walk_text_parts(child, part_id)
+        return
+
+    if _lower(structure[0]) != "text" or _is_attachment(structure):
+        return
+
+    # A non-multipart message has a single body part "1"
+    yield prefix or "1", structure
+
+
+def find_text_part(structure):
+    """
+    Locate the body section worth fetching.
+
+    Returns:
+        dict | None: {part, subtype, charset, encoding}
+        text/plain wins over text/html.
+    """
+    candidates = {}
+
+    for part_id, part in _walk_text_parts(structure):
+        subtype = _lower(part[1])
+        if subtype in ("plain", "html") and subtype not in candidates:
+            candidates[subtype] = {
+                "part": part_id,
+                "subtype": subtype,
+                "charset": _structure_params(part[2]).get("charset") or "utf-8",
+                "encoding": _lower(part[5]) or "7bit",
+            }
+
+    return candidates.get("plain") or candidates.get("html")
+
+# =========================================================
+# Body Decoding
+# =========================================================
+
+def _decode_transfer(raw: bytes, encoding: str) -> bytes:
+    """
+    Undo Content-Transfer-Encoding on a (possibly truncated) section.
+    """
+    if encoding == "base64":
+        compact = re.sub(rb"\s+", b"", raw)
+        compact = compact[:len(compact) - len(compact) % 4]
+        try:
+            return base64.b64decode(compact)
+        except Exception:
+            return b""
+
+    if encoding == "quoted-printable":
+        return quopri.decodestring(raw)
+
+    return raw
+
+
+def _html_to_text(text: str) -> str:
+    text = re.sub(r"(?is)<(script|style).*?</\1>", " ", text)
+    text = re.sub(r"(?i)<br\s*/?>|</p>|</div>", "\n", text)
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = html.unescape(text)
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    return re.sub(r"\n\s*\n+", "\n\n", text).strip()
+
+
+def decode_body(raw: bytes, text_part: dict) -> str:
+    payload = _decode_transfer(raw or b"", text_part["encoding"])
+
+    try:
+        body = payload.decode(text_part["charset"], errors="ignore")
+    except LookupError:
+        body = payload.decode("utf-8", errors="ignore")
+
+    if text_part["subtype"] == "html":
+        body = _html_to_text(body)
+
+    return body
+
+
+def _section_data(fetch_item: dict, part: str):
+    """
+    Servers answer BODY.PEEK[1]<0.N> as BODY[1]<0>; match on the prefix.
+    """
+    prefix = f"BODY[{part}]".encode()
+    for key, value in fetch_item.items():
+        if isinstance(key, bytes) and key.upper().startswith(prefix):
+            return value
+    return None
+
+# =========================================================
+# Email Document
+# =========================================================
+
+def build_email_doc(folder: str, uid: int, msg, body: str, internal_date):
+    """
+    Shape a parsed message into the raw_emails document.
+    `msg` only needs headers; the body is passed in separately.
+    """
+
+    # ---------------- Sent date (header) ----------------
+    sent_at = None
+    try:
+        date_hdr = msg.get_decoded_header("date")
+        if date_hdr:
+            sent_at = email.utils.parsedate_to_datetime(date_hdr)
+            if sent_at.tzinfo is None:
+                sent_at = sent_at.replace(tzinfo=timezone.utc)
+    except Exception:
+        sent_at = None
+
+    # ---------------- Received date (IMAP) ----------------
+    received_at = None
+    if internal_date:
+        received_at = internal_date.astimezone(timezone.utc)
+
+    message_id = (msg.get_decoded_header("message-id") or "").strip() or None
+
+    # Threading: References lists the root first, In-Reply-To the parent
+    references = threads.parse_message_ids(msg.get_decoded_header("references"))
+    in_reply_to = threads.parse_message_ids(msg.get_decoded_header("in-reply-to"))
+
+    headers = {}
+    for name in CAPTURED_HEADERS:
+        value = (msg.get_decoded_header(name) or "").strip()
+        if value:
+            headers[name] = value
+
+    # Quoted history / signatures / disclaimers stripped for the LLM
+    prompt_body, body_stats = reduce_body(body)
+
+    return {
+        "folder": folder,
+        "uid": uid,
+        "message_id": message_id,
+        "in_reply_to": in_reply_to[0] if in_reply_to else None,
+        "references": references,
+        "subject": msg.get_subject(),
+        "from": msg.get_addresses("from"),
+        "to": msg.get_addresses("to"),
+        "headers": headers,
+        "body": body[:BODY_MAX_CHARS],
+        "prompt_body": prompt_body,
+        "body_stats": body_stats,
+
+        # 🔑 Temporal fields
+        "sent_at": sent_at,
+        "received_at": received_at,
+        "ingested_at": datetime.utcnow().replace(tzinfo=timezone.utc),
+    }
+
+
+def _decode_part(part) -> str:
+    try:
+        return part.get_payload().decode(part.charset or "utf-8", errors="ignore")
+    except LookupError:
+        return part.get_payload().decode("utf-8", errors="ignore")
+
+
+def parse_raw_email(raw: bytes, folder: str, uid: int, internal_date=None):
+    """
+    Build an email_doc from a complete RFC822 message
+    (offline archives; the IMAP path never downloads full messages).
+    """
+    msg = pyzmail.PyzMessage.factory(raw)
+
+    body = ""
+    if msg.text_part:
+        body = _decode_part(msg.text_part)
+    elif msg.html_part:
+        body = _html_to_text(_decode_part(msg.html_part))
+
+    return build_email_doc(folder, uid, msg, body, internal_date)
+
+# =========================================================
+# Two-phase Fetch
+# =========================================================
+
+def fetch_messages(server, uids):
+    """
+    Fetch parsed messages for `uids` in the currently selected folder.
+
+    Phase 1: BODYSTRUCTURE + headers + INTERNALDATE.
+    Phase 2: BODY.PEEK[<text-part>]<0.N> for the text section only,
+             one round trip per distinct part number.
+
+    Returns:
+        dict: { uid: (msg, body, internal_date) }
+    """
+    header_data = server.fetch(uids, HEADER_FETCH_ITEMS)
+
+    text_parts = {}
+    by_section = {}
+
+    for uid in uids:
+        item = header_data.get(uid)
+        if not item:
+            continue
+
+        try:
+            text_part = find_text_part(item[b"BODYSTRUCTURE"])
+        except Exception:
+            text_part = None
+
+        if text_part:
+            text_parts[uid] = text_part
+            by_section.setdefault(text_part["part"], []).append(uid)
+
+    bodies = {}
+    for part, part_uids in by_section.items():
+        body_data = server.fetch(
+            part_uids,
+            [f"BODY.PEEK[{part}]<0.{BODY_FETCH_BYTES}>"]
+        )
+        for uid in part_uids:
+            raw = _section_data(body_data.get(uid, {}), part)
+            bodies[uid] = decode_body(raw, text_parts[uid])
+
+    messages = {}
+    for uid in uids:
+        item = header_data.get(uid)
+        if not item:
+            continue
+
+        msg = pyzmail.PyzMessage.factory(item[b"BODY[HEADER]"])
+        messages[uid] = (msg, bodies.get(uid, ""), item.get(b"INTERNALDATE"))
+
+    return messages
+
+# =========================================================
+# Change Detection (STATUS / UIDVALIDITY / CONDSTORE)
+# =========================================================
+
+def folder_status(server, folder: str) -> dict:
+    items = list(STATUS_ITEMS)
+    if server.has_capability("CONDSTORE"):
+        items.append("HIGHESTMODSEQ")
+
+    status = server.folder_status(folder, items)
+
+    return {
+        "uidnext": status.get(b"UIDNEXT"),
+        "uidvalidity": status.get(b"UIDVALIDITY"),
+        "highestmodseq": status.get(b"HIGHESTMODSEQ"),
+    }
+
+
+def _resync_last_uid(server, folder: str) -> int:
+    """
+    UIDVALIDITY changed: stored UIDs are meaningless.
+    Restart from the first message on/after the last ingested day;
+    already-ingested messages in that window are skipped on insert.
+    """
+    latest = emails_col.find_one(
+        {"folder": folder, "received_at": {"$ne": None}},
+        sort=[("received_at", -1)]
+    )
+
+    if not latest:
+        return 0
+
+    uids = server.search(["SINCE", latest["received_at"].date()])
+    return min(uids) - 1 if uids else 0
+
+
+def _already_ingested(email_doc) -> bool:
+    return emails_col.find_one(
+        {
+            "folder": email_doc["folder"],
+            "received_at": email_doc["received_at"],
+            "subject": email_doc["subject"],
+        },
+        {"_id": 1}
+    ) is not None
+
+# =========================================================
+# Cross-folder Deduplication
+# =========================================================
+
+def email_fingerprint(email_doc) -> str:
+    """
+    Message-ID when present; otherwise sender + sent time + subject + body.
+    """
+    message_id = (email_doc.get("message_id") or "").strip().strip("<>").lower()
+
+    if message_id:
+        basis = f"mid:{message_id}"
+    else:
+        basis = "|".join([
+            "content",
+            str(email_doc.get("from")),
+            email_doc["sent_at"].isoformat() if email_doc.get("sent_at") else "",
+            email_doc.get("subject") or "",
+            (email_doc.get("body") or "")[:1000],
+        ])
+
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()
+
+
+def persist_email(email_doc) -> bool:
+    """
+    Insert into raw_emails.
+
+    Returns:
+        True  → canonical copy, should go on to extraction
+        False → duplicate of a message already ingested from another
+                folder; stored with `duplicate_of` and skipped
+    """
+    email_doc["fingerprint"] = email_fingerprint(email_doc)
+    email_doc["canonical"] = True
+
+    try:
+        emails_col.insert_one(email_doc)
+        return True
+    except DuplicateKeyError:
+        email_doc.pop("_id", None)
+
+    # Persisted by an earlier run that stopped before the email was
+    # consumed (so its UID was never checkpointed): still the canonical copy
+    earlier = emails_col.find_one(
+        {
+            "fingerprint": email_doc["fingerprint"],
+            "canonical": True,
+            "folder": email_doc["folder"],
+            "uid": email_doc["uid"],
+        },
+        {"_id": 1}
+    )
+    if earlier:
+        email_doc["_id"] = earlier["_id"]
+        return True
+
+    canonical = emails_col.find_one_and_update(
+        {"fingerprint": email_doc["fingerprint"], "canonical": True},
+        {"$addToSet": {
+            "seen_in": {"folder": email_doc["folder"], "uid": email_doc["uid"]}
+        }},
+        projection={"_id": 1}
+    )
+
+    email_doc["canonical"] = False
+    email_doc.pop("work", None)
+    email_doc["duplicate_of"] = canonical["_id"] if canonical else None
+    emails_col.insert_one(email_doc)
+
+    logger.info(
+        "Skipping duplicate email %s/%s (Message-ID=%s)",
+        email_doc["folder"],
+        email_doc["uid"],
+        email_doc.get("message_id")
+    )
+    return False
+
+
+def persist_emails_bulk(email_docs) -> list:
+    """
+    insert_many variant of persist_email() for backfills.
+
+    Returns:
+        list: the canonical docs (duplicates are stored and linked,
+        exactly as persist_email does, but not returned)
+    """
+    if not email_docs:
+        return []
+
+    for email_doc in email_docs:
+        email_doc["fingerprint"] = email_fingerprint(email_doc)
+        email_doc["canonical"] = True
+
+    rejected = set()
+    try:
+        emails_col.insert_many(email_docs, ordered=False)
+    except BulkWriteError as exc:
+        for error in exc.details.get("writeErrors", []):
+            if error.get("code") != 11000:
+                raise
+            rejected.add(error["index"])
+
+    canonical_docs = []
+    for idx, email_doc in enumerate(email_docs):
+        if idx not in rejected:
+            canonical_docs.append(email_doc)
+            continue
+
+        email_doc.pop("_id", None)
+        if persist_email(email_doc):
+            canonical_docs.append(email_doc)
+
+    return canonical_docs
+
 # =========================================================
 # Email Fetcher
 # =========================================================
 
+def iter_folder(server, folder: str, state: dict | None = None, progress: dict | None = None):
+    """
+    Stream the next batch of one folder on an already authenticated
+    connection, yielding each email_doc once it is persisted.
+
+    - An unchanged folder (UIDNEXT already covered by last_uid) costs a
+      single STATUS round trip and is never selected
+    - Messages are fetched STREAM_CHUNK_SIZE at a time
+    - last_uid is checkpointed per message, once the consumer asks for
+      the next one: an email the consumer never took is fetched again
+
+    `progress["exhausted"]` is set once the folder is done.
+    """
+    for email_doc, checkpoint in _folder_items(server, folder, state, progress):
+        if email_doc is not None:
+            yield email_doc
+        checkpoint()
+
+
+def _folder_items(server, folder: str, state: dict | None, progress: dict | None):
+    """
+    iter_folder() without the checkpointing: yields (email_doc, checkpoint)
+    for every new UID in order, email_doc None for a skipped message.
+    Calling checkpoint() records the UID as consumed.
+    """
+    if state is None:
+        state = state_col.find_one({"folder": folder}) or {}
+    if progress is None:
+        progress = {}
+
+    progress["exhausted"] = True
+
+    status = folder_status(server, folder)
+    last_uid = state.get("last_uid", 0)
+    resync = False
+
+    stored_validity = state.get("uidvalidity")
+    if (
+        stored_validity is not None
+        and status["uidvalidity"] is not None
+        and status["uidvalidity"] != stored_validity
+    ):
+        logger.warning(
+            "UIDVALIDITY changed for '%s' (%s → %s); resyncing",
+            folder,
+            stored_validity,
+            status["uidvalidity"]
+        )
+        server.select_folder(folder)
+        last_uid = _resync_last_uid(server, folder)
+        resync = True
+
+    elif status["uidnext"] is not None and last_uid >= status["uidnext"] - 1:
+        if any(state.get(k) != v for k, v in status.items()):
+            update_sync_state(folder, **status)
+        return
+
+    if not resync:
+        server.select_folder(folder)
+
+    uids = server.search(["UID", f"{last_uid + 1}:*"])
+
+    # "n:*" always matches the highest UID, even when it is <= last_uid
+    uids = sorted(uid for uid in uids if uid > last_uid)
+
+    if not uids:
+        update_sync_state(folder, last_uid=last_uid, **status)
+        return
+
+    uids_to_process = uids[:BATCH_SIZE]
+    progress["exhausted"] = len(uids) <= BATCH_SIZE
+
+    for i in range(0, len(uids_to_process), STREAM_CHUNK_SIZE):
+        chunk = uids_to_process[i:i + STREAM_CHUNK_SIZE]
+        messages = fetch_messages(server, chunk)
+
+        for uid in chunk:
+            email_doc = None
+
+            if uid in messages:
+                msg, body, internal_date = messages.pop(uid)
+                email_doc = build_email_doc(folder, uid, msg, body, internal_date)
+                email_doc["uidvalidity"] = status["uidvalidity"]
+                triage.annotate(email_doc)
+                threads.assign_thread(email_doc)
+                work_queue.annotate(email_doc)
+
+                if resync and _already_ingested(email_doc):
+                    email_doc = None
+                elif not persist_email(email_doc):
+                    email_doc = None
+
+            yield email_doc, partial(update_sync_state, folder, last_uid=uid, **status)
+
+
+def fetch_folder(server, folder: str, state: dict | None = None):
+    """
+    Ingest the next batch of one folder.
+
+    Returns:
+        (emails, exhausted)
+    """
+    progress = {}
+    emails = list(iter_folder(server, folder, state, progress))
+    return emails, progress["exhausted"]
+
+
+_FOLDER_DONE = object()
+
+
+def _put(out: Queue, item, stop) -> bool:
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=1)
+            return True
+        except Full:
+            continue
+    return False
+
+
+def _stream_folder_pooled(pool, folder: str, state: dict, out: Queue, stop, progress: dict):
+    """
+    Producer: push one folder's (email_doc, checkpoint) pairs into the
+    bounded queue, blocking while the consumer is behind. Always ends
+    with _FOLDER_DONE.
+
+    Checkpoints travel with the emails and are run by the consumer, so
+    emails still queued when it stops are not checkpointed. Skipped
+    UIDs ride along with the next queued item.
+    """
+    folder_progress = {}
+    checkpoint = None
+
+    # Consumer already gone: don't open an IMAP session for nothing
+    if stop.is_set():
+        progress["exhausted"] = False
+        return
+
+    try:
+        with pool.connection() as server:
+            with closing(_folder_items(server, folder, state, folder_progress)) as items:
+                for email_doc, checkpoint in items:
+                    if email_doc is None:
+                        continue
+                    if not _put(out, (email_doc, checkpoint), stop):
+                        folder_progress["exhausted"] = False
+                        break
+                    checkpoint = None
+    except Exception:
+        logger.exception("Failed to fetch folder '%s'", folder)
+        folder_progress["exhausted"] = False
+
+    if not folder_progress.get("exhausted", True):
+        progress["exhausted"] = False
+
+    _put(out, (_FOLDER_DONE, checkpoint), stop)
+
+
+def stream_new_emails(progress: dict | None = None):
+    """
+    Yield each new email_doc as soon as it is parsed and persisted.
+
+    Folders are fetched in parallel over a bounded pool of IMAP
+    connections; at most STREAM_QUEUE_SIZE parsed emails are buffered
+    ahead of the consumer, whatever BATCH_SIZE is.
+
+    `progress["exhausted"]` is final once the generator is exhausted.
+    A folder's last_uid only advances past emails the consumer took;
+    queued emails dropped on an early stop are fetched again next run.
+    A failing folder is logged and reported as not exhausted so the
+    agent retries it soon.
+    """
+    if progress is None:
+        progress = {}
+
+    progress["exhausted"] = True
+
+    # Includes the unique fingerprint index cross-folder dedupe relies on
+    ensure_indexes()
+
+    out = Queue(maxsize=STREAM_QUEUE_SIZE)
+    stop = Event()
+
+    with IMAPConnectionPool(IMAP_POOL_SIZE) as pool:
+        with pool.connection() as server:
+            folders = list_inbox_folders(server)
+
+        states = load_sync_states()
+
+        with ThreadPoolExecutor(
+            max_workers=pool.size,
+            thread_name_prefix="imap-fetch"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _stream_folder_pooled,
+                    pool,
+                    folder,
+                    states.get(folder, {}),
+                    out,
+                    stop,
+                    progress
+                )
+                for folder in folders
+            ]
+
+            try:
+                pending = len(futures)
+                while pending:
+                    item, checkpoint = out.get()
+                    if item is _FOLDER_DONE:
+                        pending -= 1
+                    else:
+                        yield item
+                    # Resumed: the consumer has taken `item`
+                    if checkpoint:
+                        checkpoint()
+            finally:
+                # Consumer stopped early: release blocked producers and
+                # drop folders that have not started yet
+                stop.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+
 def fetch_new_emails():
-    collected_emails = []
-    exhausted = True
-
-    with IMAPClient(IMAP_HOST) as server:
-        server.login(EMAIL_USER, EMAIL_PASS)
-
-        folders = list_inbox_folders(server)
-
-        for folder in folders:
-            server.select_folder(folder)
-
-            last_uid = get_last_uid(folder)
-            uids = server.search(["UID", f"{last_uid + 1}:*"])
-
-            if not uids:
-                continue
-
-            uids = sorted(uids)
-            uids_to_process = uids[:BATCH_SIZE]
-
-            fetch_data = server.fetch(
-                uids_to_process,
-                ["RFC822", "INTERNALDATE"]
-            )
-
-            for uid in uids_to_process:
-                raw = fetch_data[uid][b"RFC822"]
-                internal_date = fetch_data[uid].get(b"INTERNALDATE")
-
-                msg = pyzmail.PyzMessage.factory(raw)
-
-                # ---------------- Body ----------------
-                body = ""
-                if msg.text_part:
-                    body = msg.text_part.get_payload().decode(
-                        msg.text_part.charset or "utf-8",
-                        errors="ignore"
-                    )
-
-                # ---------------- Sent date (header) ----------------
-                sent_at = None
-                try:
-                    date_hdr = msg.get_decoded_header("date")
-                    if date_hdr:
-                        sent_at = email.utils.parsedate_to_datetime(date_hdr)
-                        if sent_at.tzinfo is None:
-                            sent_at = sent_at.replace(tzinfo=timezone.utc)
-                except Exception:
-                    sent_at = None
-
-                # ---------------- Received date (IMAP) ----------------
-                received_at = None
-                if internal_date:
-                    received_at = internal_date.astimezone(timezone.utc)
-
-                email_doc = {
-                    "folder": folder,
-                    "uid": uid,
-                    "subject": msg.get_subject(),
-                    "from": msg.get_addresses("from"),
-                    "to": msg.get_addresses("to"),
-                    "body": body[:5000],
-
-                    # 🔑 Temporal fields
-                    "sent_at": sent_at,
-                    "received_at": received_at,
-                    "ingested_at": datetime.utcnow().replace(tzinfo=timezone.utc),
-                }
-
-                emails_col.insert_one(email_doc)
-                collected_emails.append(email_doc)
-
-            update_last_uid(folder, uids_to_process[-1])
-
-            if len(uids) > BATCH_SIZE:
-                exhausted = False
+    """
+    Batch wrapper around stream_new_emails().
+    """
+    progress = {}
+    emails = list(stream_new_emails(progress))
 
     return {
-        "emails": collected_emails,
-        "exhausted": exhausted
+        "emails": emails,
+        "exhausted": progress["exhausted"]
     }
 
 # =========================================================
@@ -0,0 +1,152 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.agents.task_manager.task_extractor import extract_tasks, extract_tasks_batch
+from src.agents.task_manager.utils.llm_client import get_llm_client, LLMUnavailable
+from src.config.config import (
+    LLM_CONCURRENCY,
+    LLM_BATCH_MAX_EMAILS,
+    LLM_OUTAGE_MAX_WAITS,
+    OLLAMA_TIMEOUT,
+)
+
+logger = logging.getLogger("agent.task_manager.extraction_pool")
+
+
+class ExtractionPool:
+    """
+    Runs extract_tasks() concurrently against the Ollama endpoint.
+
+    - At most `concurrency` jobs in flight, whoever the caller is
+    - Request starts are token-bucket limited per LLM call (LLMClient)
+    - Every request carries its own HTTP timeout
+    - Results are the same task dicts extract_tasks() returns
+    """
+
+    def __init__(
+        self,
+        concurrency: int = LLM_CONCURRENCY,
+        timeout: float = OLLAMA_TIMEOUT,
+        max_outage_waits: int = LLM_OUTAGE_MAX_WAITS,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.max_outage_waits = max(0, max_outage_waits)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="llm-extract"
+        )
+
+    def _until_available(self, fn, *args):
+        """
+        Run fn; up to `max_outage_waits` outages are waited out and
+        retried, so a short Ollama restart drops no email. LLMUnavailable
+        opens the breaker (see LLMClient.post), so each wait is at least
+        one reset period. After that the error is raised for this email.
+        """
+        breaker = get_llm_client().breaker
+
+        for wait in range(self.max_outage_waits + 1):
+            try:
+                return fn(*args, timeout=self.timeout)
+            except LLMUnavailable:
+                if wait == self.max_outage_waits:
+                    raise
+                logger.warning(
+                    "⏸️ Ollama unavailable; retrying once it recovers (%d/%d)",
+                    wait + 1,
+                    self.max_outage_waits
+                )
+                breaker.wait_closed()
+
+    def _run(self, email):
+        return self._until_available(extract_tasks, email)
+
+    def submit(self, email):
+        """
+        Returns:
+            Future[list[dict]]
+        """
+        return self._executor.submit(self._run, email)
+
+    def extract(self, email) -> list:
+        """
+        Blocking, pool-limited extract_tasks().
+        Raises whatever extract_tasks raised.
+        """
+        return self.submit(email).result()
+
+    def extract_many(self, emails):
+        """
+        Yield (email, tasks, error) as extractions complete.
+        Exactly one of tasks / error is None.
+        """
+        futures = {self.submit(email): email for email in emails}
+
+        for future in as_completed(futures):
+            email = futures[future]
+            try:
+                yield email, future.result(), None
+            except Exception as exc:
+                logger.exception(
+                    "❌ Unable to extract tasks from email UID=%s",
+                    email.get("uid")
+                )
+                yield email, None, exc
+
+    def _run_batch(self, emails):
+        return self._until_available(extract_tasks_batch, emails)
+
+    def extract_many_batched(self, emails, group_size: int = LLM_BATCH_MAX_EMAILS):
+        """
+        Like extract_many(), but each pool job packs up to `group_size`
+        emails into batched prompts (see extract_tasks_batch).
+        Yields (email, tasks, error); a failed job fails only its emails.
+        """
+        emails = list(emails)
+        futures = {}
+        for i in range(0, len(emails), group_size):
+            group = emails[i:i + group_size]
+            futures[self._executor.submit(self._run_batch, group)] = group
+
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as exc:
+                logger.exception(
+                    "❌ Unable to extract tasks from email UID(s) %s",
+                    [email.get("uid") for email in futures[future]]
+                )
+                results = [(email, None, exc) for email in futures[future]]
+
+            yield from results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# =========================================================
+# Shared Pool
+# =========================================================
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """
+    Process-wide pool so every caller shares one concurrency/rate budget.
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+
+    return _pool
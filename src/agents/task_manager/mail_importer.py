@@ -0,0 +1,228 @@
+import os
+import sys
+import argparse
+import logging
+import mailbox
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from src.db import ensure_indexes
+from src.agents.task_manager.email_reader import (
+    parse_raw_email,
+    persist_emails_bulk,
+)
+from src.agents.task_manager.utils import triage, threads
+
+logger = logging.getLogger("agent.task_manager.mail_importer")
+
+# =========================================================
+# Configuration
+# =========================================================
+
+# Messages parsed + bulk-inserted per window (bounds memory)
+IMPORT_WINDOW_SIZE = 500
+DEFAULT_EXTRACT_WORKERS = 2
+
+# =========================================================
+# Archive Reading
+# =========================================================
+
+def open_archive(path: Path, fmt: str = "auto"):
+    if fmt == "auto":
+        fmt = "maildir" if path.is_dir() else "mbox"
+
+    if fmt == "maildir":
+        return mailbox.Maildir(str(path), factory=None, create=False)
+    if fmt == "mbox":
+        return mailbox.mbox(str(path), factory=None, create=False)
+
+    raise ValueError(f"Unsupported archive format: {fmt}")
+
+
+def _delivery_date(message):
+    """
+    Best stand-in for IMAP INTERNALDATE: Maildir delivery time or the
+    mbox "From " line. None if neither is usable.
+    """
+    try:
+        if isinstance(message, mailbox.MaildirMessage):
+            return datetime.fromtimestamp(message.get_date(), tz=timezone.utc)
+
+        if isinstance(message, mailbox.mboxMessage):
+            stamp = " ".join(message.get_from().split()[-5:])
+            return datetime.strptime(stamp, "%a %b %d %H:%M:%S %Y").replace(
+                tzinfo=timezone.utc
+            )
+    except Exception:
+        return None
+
+    return None
+
+
+def iter_archive(archive, folder: str):
+    """
+    Yield (raw_bytes, folder, uid, internal_date) in archive order.
+    uid is the 1-based position within the archive.
+    """
+    for uid, (_, message) in enumerate(archive.iteritems(), start=1):
+        yield message.as_bytes(), folder, uid, _delivery_date(message)
+
+# =========================================================
+# Parsing (process pool)
+# =========================================================
+
+def _parse_entry(entry):
+    raw, folder, uid, internal_date = entry
+    try:
+        email_doc = parse_raw_email(raw, folder, uid, internal_date)
+    except Exception:
+        return None
+
+    # Archives rarely carry INTERNALDATE; the Date header is the next best thing
+    if not email_doc["received_at"]:
+        email_doc["received_at"] = email_doc["sent_at"]
+
+    return triage.annotate(email_doc)
+
+# =========================================================
+# Import
+# =========================================================
+
+def import_archive(
+    path,
+    *,
+    fmt: str = "auto",
+    folder: str | None = None,
+    parse_workers: int | None = None,
+    extract_workers: int = DEFAULT_EXTRACT_WORKERS,
+    extract: bool = True,
+    batch: bool = False,
+    limit: int | None = None,
+):
+    """
+    Backfill raw_emails from a local mbox/Maildir export.
+
+    - Parsing runs in a process pool, IMPORT_WINDOW_SIZE messages at a time
+    - Each window is bulk-inserted (cross-folder dedupe still applies)
+    - Canonical emails are fed to the extraction + CF pipeline with
+      `extract_workers` threads
+    - With `batch`, short emails share one LLM prompt (extract_tasks_batch)
+
+    Returns:
+        dict: counters {parsed, failed, inserted, duplicates, processed}
+    """
+    path = Path(path).expanduser()
+    folder = folder or f"import:{path.name}"
+    archive = open_archive(path, fmt)
+
+    process_email = None
+    if extract:
+        from src.agents.task_manager.agent import process_email
+        from src.agents.task_manager.extraction_pool import get_extraction_pool
+        from src.agents.task_manager.pipeline import process_extracted
+
+    ensure_indexes()
+
+    stats = {"parsed": 0, "failed": 0, "inserted": 0, "duplicates": 0, "processed": 0}
+    entries = iter_archive(archive, folder)
+    if limit:
+        entries = islice(entries, limit)
+
+    with ProcessPoolExecutor(max_workers=parse_workers or os.cpu_count()) as parsers, \
+            ThreadPoolExecutor(max_workers=max(1, extract_workers)) as extractors:
+
+        while True:
+            window = list(islice(entries, IMPORT_WINDOW_SIZE))
+            if not window:
+                break
+
+            # Thread lookups hit Mongo, so they stay in this process
+            docs = [
+                threads.assign_thread(doc)
+                for doc in parsers.map(_parse_entry, window, chunksize=25)
+                if doc is not None
+            ]
+            stats["parsed"] += len(docs)
+            stats["failed"] += len(window) - len(docs)
+
+            canonical = persist_emails_bulk(docs)
+            stats["inserted"] += len(canonical)
+            stats["duplicates"] += len(docs) - len(canonical)
+
+            if process_email and batch:
+                pool = get_extraction_pool()
+                wanted = [email for email in canonical if triage.should_extract(email)]
+                stats["processed"] += len(canonical) - len(wanted)
+                for email, tasks, error in pool.extract_many_batched(wanted):
+                    if error is None:
+                        process_extracted(email, tasks)
+                    stats["processed"] += 1
+            elif process_email:
+                for _ in extractors.map(process_email, canonical):
+                    stats["processed"] += 1
+
+            logger.info(
+                "📦 Imported %d message(s) from %s (%d duplicate(s), %d failed)",
+                stats["parsed"],
+                path,
+                stats["duplicates"],
+                stats["failed"]
+            )
+
+    return stats
+
+# =========================================================
+# CLI Entry
+# =========================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="workctl import-mail",
+        description="Backfill raw_emails (and tasks) from an mbox/Maildir export"
+    )
+    parser.add_argument("path", help="mbox file or Maildir directory")
+    parser.add_argument("--format", choices=["auto", "mbox", "maildir"], default="auto")
+    parser.add_argument("--folder", help="Folder label stored on the emails (default: import:<name>)")
+    parser.add_argument("--parse-workers", type=int, help="Parser processes (default: CPU count)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_EXTRACT_WORKERS,
+        help="Concurrent extraction workers"
+    )
+    parser.add_argument("--no-extract", action="store_true", help="Only import into raw_emails")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Pack short emails into shared extraction prompts"
+    )
+    parser.add_argument("--limit", type=int, help="Stop after N messages")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+    print(f"\n📦 Importing mail archive: {args.path}\n")
+
+    stats = import_archive(
+        args.path,
+        fmt=args.format,
+        folder=args.folder,
+        parse_workers=args.parse_workers,
+        extract_workers=args.workers,
+        extract=not args.no_extract,
+        batch=args.batch,
+        limit=args.limit,
+    )
+
+    print("\n✅ Import complete")
+    print(f"📨 Parsed     : {stats['parsed']}")
+    print(f"🆕 Inserted   : {stats['inserted']}")
+    print(f"🔁 Duplicates : {stats['duplicates']}")
+    print(f"⚠️ Failed     : {stats['failed']}")
+    if not args.no_extract:
+        print(f"🧠 Processed  : {stats['processed']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,126 @@
+import time
+import logging
+import threading
+
+from imapclient import IMAPClient
+
+from src.config.config import IMAP_HOST, IMAP_PORT, IMAP_SSL, EMAIL_USER, EMAIL_PASS
+
+logger = logging.getLogger("agent.task_manager.mail_watcher")
+
+# =========================================================
+# Configuration
+# =========================================================
+
+# Servers may drop IDLE after 30 min (RFC 2177); re-issue before that
+IDLE_RENEW_SECONDS = 25 * 60
+IDLE_CHECK_SECONDS = 30
+
+RECONNECT_BACKOFF_START = 5
+RECONNECT_BACKOFF_MAX = 5 * 60
+
+# =========================================================
+# Capability Probe
+# =========================================================
+
+def server_supports_idle() -> bool:
+    with IMAPClient(IMAP_HOST, port=IMAP_PORT, ssl=IMAP_SSL) as server:
+        server.login(EMAIL_USER, EMAIL_PASS)
+        return server.has_capability("IDLE")
+
+
+def _has_new_mail(responses) -> bool:
+    for resp in responses:
+        if len(resp) >= 2 and resp[1] in (b"EXISTS", b"RECENT"):
+            return True
+    return False
+
+# =========================================================
+# Watcher
+# =========================================================
+
+class MailboxWatcher:
+    """
+    Keeps one persistent IMAP session per folder parked in IDLE and
+    sets `wake` whenever the server reports new messages.
+
+    Connection failures are retried with exponential backoff.
+    If the server turns out not to support IDLE, `unsupported` is set
+    (and `wake` too, so the caller can fall back to polling).
+    """
+
+    def __init__(self, folders, wake: threading.Event):
+        self.folders = list(folders)
+        self.wake = wake
+        self.unsupported = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for folder in self.folders:
+            thread = threading.Thread(
+                target=self._watch,
+                args=(folder,),
+                name=f"imap-idle:{folder}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=IDLE_CHECK_SECONDS + 5)
+
+    # -----------------------------------------------------
+
+    def _watch(self, folder: str):
+        backoff = RECONNECT_BACKOFF_START
+
+        while not self._stop.is_set():
+            connected_at = time.monotonic()
+            try:
+                self._idle_session(folder)
+            except Exception:
+                if self._stop.is_set():
+                    return
+                # A long-lived session that finally dropped is not a flapping server
+                if time.monotonic() - connected_at > RECONNECT_BACKOFF_MAX:
+                    backoff = RECONNECT_BACKOFF_START
+                logger.exception(
+                    "IDLE session for '%s' failed; reconnecting in %ds",
+                    folder,
+                    backoff
+                )
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+
+            if self.unsupported.is_set():
+                return
+
+    def _idle_session(self, folder: str):
+        with IMAPClient(IMAP_HOST, port=IMAP_PORT, ssl=IMAP_SSL) as server:
+            server.login(EMAIL_USER, EMAIL_PASS)
+
+            if not server.has_capability("IDLE"):
+                logger.warning("IMAP server does not support IDLE")
+                self.unsupported.set()
+                self.wake.set()
+                return
+
+            server.select_folder(folder, readonly=True)
+            logger.info("👂 IDLE on folder '%s'", folder)
+
+            while not self._stop.is_set():
+                server.idle()
+                started = time.monotonic()
+                try:
+                    while not self._stop.is_set():
+                        responses = server.idle_check(timeout=IDLE_CHECK_SECONDS)
+                        if _has_new_mail(responses):
+                            logger.info("📬 New mail signalled in '%s'", folder)
+                            self.wake.set()
+                        if time.monotonic() - started >= IDLE_RENEW_SECONDS:
+                            break
+                finally:
+                    server.idle_done()
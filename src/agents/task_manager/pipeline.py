@@ -0,0 +1,296 @@
+import time
+import logging
+import threading
+from itertools import islice
+from queue import Queue
+from datetime import datetime, timezone
+
+from src.db import get_collection
+from src.agents.task_manager.extraction_pool import get_extraction_pool
+from src.agents.task_manager.task_store import store_task
+from src.agents.task_manager.utils.cf_engine import process_event
+from src.agents.task_manager.utils.triage import should_extract
+from src.config.config import (
+    LLM_CONCURRENCY,
+    LLM_BATCH_MAX_EMAILS,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_EXTRACT_WORKERS,
+    PIPELINE_STORE_WORKERS,
+    PIPELINE_CF_WORKERS,
+)
+
+logger = logging.getLogger("agent.task_manager.pipeline")
+
+edges_col = get_collection("event_cf_edges")
+
+# =========================================================
+# Stage Functions
+# Each takes one item and returns the items for the next stage.
+# =========================================================
+
+def email_received_at(email) -> datetime:
+    # 🔑 Email receipt time (SOURCE OF TRUTH)
+    received_at = email.get("received_at")
+
+    # Fallback (should rarely happen)
+    if not received_at:
+        received_at = datetime.utcnow().replace(tzinfo=timezone.utc)
+
+    return received_at
+
+
+def extract_stage(email) -> list:
+    uid = email.get("uid")
+
+    # Newsletters, auto-replies, etc. never reach the LLM
+    if not should_extract(email):
+        return []
+
+    logger.info("Processing email UID=%s", uid)
+    tasks = get_extraction_pool().extract(email)
+
+    if not tasks:
+        logger.info(
+            "No actionable tasks found for email UID=%s",
+            uid
+        )
+        return []
+
+    # All tasks of an email travel (and are stored) together
+    return [(email, tasks)]
+
+
+def store_stage(item) -> list:
+    email, tasks = item
+    received_at = email_received_at(email)
+
+    # ----------------------------------------
+    # 🔑 Set task origin time = email received time
+    # ----------------------------------------
+    for task in tasks:
+        task["created_at"] = received_at.isoformat()
+        task["last_activity_at"] = received_at.isoformat()
+
+    # ----------------------------------------
+    # Store tasks (identity owned by task_store), one round trip
+    # ----------------------------------------
+    results = store_task(tasks)
+
+    for result in results:
+        logger.info(
+            "📝 %s task '%s' (task_id=%s) from email UID=%s",
+            "Failed to store" if result["error"]
+            else "Linked" if result["duplicate_of"]
+            else "Stored" if result["inserted"] else "Updated",
+            result["title"],
+            result["task_id"],
+            email.get("uid")
+        )
+
+    # New tasks become CF events, and so do replayed ones that never got
+    # their edges (e.g. a work item that failed between store and CF).
+    # A linked duplicate is represented by its canonical task.
+    candidates = [
+        (task, result) for task, result in zip(tasks, results)
+        if not result["duplicate_of"] and not result["error"]
+    ]
+    replayed = [result["task_id"] for _, result in candidates if not result["inserted"]]
+    linked = set(edges_col.distinct("event_id", {"event_id": {"$in": replayed}})) if replayed else set()
+
+    return [
+        (email, task)
+        for task, result in candidates
+        if result["task_id"] not in linked
+    ]
+
+
+def cf_stage(item) -> list:
+    email, task = item
+    task_id = task.get("task_id")
+
+    # ----------------------------------------
+    # Emit TASK event to CF engine
+    # Use email time, not now()
+    # ----------------------------------------
+    if task_id:
+        process_event(
+            event_id=task_id,
+            event_type="task",
+            event_text=task.get("title", ""),
+            now=email_received_at(email)
+        )
+    else:
+        logger.warning(
+            "⚠️ Skipping CF event for task without task_id (email UID=%s)",
+            email.get("uid")
+        )
+
+    return []
+
+
+def process_extracted(email, tasks):
+    """
+    Store and CF-link tasks already extracted for `email` (serially).
+    """
+    if not tasks:
+        return
+
+    try:
+        stored = store_stage((email, tasks))
+    except Exception:
+        logger.exception(
+            "❌ Failed to store tasks from email UID=%s",
+            email.get("uid")
+        )
+        return
+
+    for item in stored:
+        try:
+            cf_stage(item)
+        except Exception:
+            logger.exception(
+                "❌ Failed to process task from email UID=%s",
+                email.get("uid")
+            )
+
+# =========================================================
+# Pipelined Engine
+# =========================================================
+
+_STOP = object()
+
+
+def _new_stage_stats():
+    return {"items": 0, "errors": 0, "busy_seconds": 0.0, "latencies": []}
+
+
+def _stage_worker(name, fn, inbox: Queue, outbox: Queue | None, stats: dict, lock):
+    while True:
+        item = inbox.get()
+        if item is _STOP:
+            return
+
+        started = time.perf_counter()
+        try:
+            results = fn(item)
+            failed = False
+        except Exception:
+            logger.exception("❌ Pipeline stage '%s' failed", name)
+            results = []
+            failed = True
+        elapsed = time.perf_counter() - started
+
+        with lock:
+            stats["items"] += 1
+            stats["errors"] += int(failed)
+            stats["busy_seconds"] += elapsed
+            stats["latencies"].append(elapsed)
+
+        if outbox is not None:
+            for result in results:
+                # Blocks while the next stage is saturated (backpressure)
+                outbox.put(result)
+
+
+def run_pipeline(
+    emails,
+    *,
+    extract_workers: int = PIPELINE_EXTRACT_WORKERS,
+    store_workers: int = PIPELINE_STORE_WORKERS,
+    cf_workers: int = PIPELINE_CF_WORKERS,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+):
+    """
+    Push `emails` (any iterable, typically stream_new_emails()) through
+    extract → store → CF stages running concurrently.
+
+    - Bounded queues between stages; a slow stage blocks its producer,
+      all the way back to the IMAP fetch
+    - Per-stage worker counts bound concurrency against Ollama / Mongo
+    - Throughput is set by the slowest stage, not the sum of all stages
+
+    Returns:
+        dict: { stage: {items, errors, busy_seconds, latencies} }
+    """
+    stage_specs = [
+        ("extract", extract_stage, extract_workers),
+        ("store", store_stage, store_workers),
+        ("cf", cf_stage, cf_workers),
+    ]
+
+    queues = [Queue(maxsize=max(1, queue_size)) for _ in stage_specs]
+    stats = {"fetch": _new_stage_stats()}
+    lock = threading.Lock()
+    stages = []
+
+    for idx, (name, fn, workers) in enumerate(stage_specs):
+        stats[name] = _new_stage_stats()
+        outbox = queues[idx + 1] if idx + 1 < len(queues) else None
+        threads = [
+            threading.Thread(
+                target=_stage_worker,
+                args=(name, fn, queues[idx], outbox, stats[name], lock),
+                name=f"pipeline-{name}-{n}",
+                daemon=True
+            )
+            for n in range(max(1, workers))
+        ]
+        for thread in threads:
+            thread.start()
+        stages.append((queues[idx], threads))
+
+    try:
+        iterator = iter(emails)
+        while True:
+            started = time.perf_counter()
+            try:
+                email = next(iterator)
+            except StopIteration:
+                break
+            elapsed = time.perf_counter() - started
+
+            fetch_stats = stats["fetch"]
+            fetch_stats["items"] += 1
+            fetch_stats["busy_seconds"] += elapsed
+            fetch_stats["latencies"].append(elapsed)
+
+            queues[0].put(email)
+    finally:
+        # Drain stage by stage so nothing is left in flight
+        for inbox, threads in stages:
+            for _ in threads:
+                inbox.put(_STOP)
+            for thread in threads:
+                thread.join()
+
+    return stats
+
+# =========================================================
+# Batched Engine
+# =========================================================
+
+def run_batched(emails, window: int = LLM_BATCH_MAX_EMAILS * LLM_CONCURRENCY) -> int:
+    """
+    Take `emails` `window` at a time and extract each window with
+    extract_many_batched() (short emails share one prompt), then store
+    and CF-link serially. A failed email is logged and skipped.
+
+    Returns:
+        int: emails taken from `emails`
+    """
+    pool = get_extraction_pool()
+    iterator = iter(emails)
+    count = 0
+
+    while True:
+        batch = list(islice(iterator, max(1, window)))
+        if not batch:
+            return count
+        count += len(batch)
+
+        wanted = [email for email in batch if should_extract(email)]
+        for email, tasks, error in pool.extract_many_batched(wanted):
+            if error is not None:
+                logger.error("❌ Unable to extract tasks from email UID=%s: %s", email.get("uid"), error)
+                continue
+            process_extracted(email, tasks)
@@ -30,7 +30,7 @@ def compute_cf_priority_boost(task_id):
     # Find CFs linked to this task
     edges = list(edges_col.find(
         {
-            "event_id": f"TASK-{task_id}"
+            "event_id": task_id
         },
         {"_id": 0, "cf_id": 1}
     ))
@@ -74,7 +74,8 @@ def get_top_priority_tasks(limit=5):
     """
 
     tasks = list(tasks_col.find(
-        {"status": "OPEN"},
+        # Linked near-duplicates are shown through their canonical task
+        {"status": "OPEN", "duplicate_of": None},
         {
             "_id": 0,
             "task_id": 1,
@@ -1,27 +1,39 @@
 import requests
 import json
+import time
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
-from src.config.config import OLLAMA_URL, OLLAMA_MODEL
+from urllib3.exceptions import ReadTimeoutError
+
+from src.config.config import (
+    OLLAMA_MODEL,
+    OLLAMA_TIMEOUT,
+    OLLAMA_STREAM,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_CLASSIFIER_MODEL,
+    CASCADE_THRESHOLD,
+    CASCADE_CLASSIFIER_TIMEOUT,
+    LLM_BATCH_TOKEN_BUDGET,
+    LLM_BATCH_MAX_EMAILS,
+    LLM_BATCH_SHORT_EMAIL_TOKENS,
+)
 from src.agents.task_manager.utils.project_resolver import resolve_project_id
 from src.agents.task_manager.utils.verb_resolver import resolve_task_verb
+from src.agents.task_manager.utils import extraction_cache, llm_metrics, threads
+from src.agents.task_manager.utils.llm_client import get_llm_client, LLMUnavailable
+from src.agents.task_manager.utils.json_stream import TaskArrayParser, InvalidStream
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt below changes meaningfully;
+# it is part of the extraction cache key.
+PROMPT_VERSION = 1
 
-def extract_tasks(email):
-    """
-    Extract actionable tasks from an email using Ollama.
-
-    Responsibilities:
-    - Call LLM for task extraction ONLY
-    - Enrich tasks with deterministic metadata
-    - NEVER generate task_id
-    - NEVER write to DB
-    """
 
-    prompt = f"""
+PROMPT_PREAMBLE = """
 You are assisting Ras Dwivedi, CTO of C3I Hub.
 
 Owner:
@@ -37,13 +49,10 @@ Institutional task:
 Examples:
 - "Define SOC alert resolution SOP" → institutional = true
 - "Share meeting link" → institutional = false
+"""
 
-Extract ACTIONABLE TASKS from the email below.
-If no actionable task exists, return EMPTY.
-
-Return STRICT JSON array only:
-[
-  {{
+TASK_SCHEMA = """[
+  {
     "title": "...",
     "owner": "...",
     "due_by": "YYYY-MM-DD or null",
@@ -51,29 +60,150 @@ Return STRICT JSON array only:
     "blocks_others": true/false,
     "external_dependency": true/false,
     "delegatable": true/false
-  }}
-]
+  }
+]"""
+
+
+def prompt_body(email) -> str:
+    # Thread delta for replies, else the reduced body (older docs lack it)
+    return email.get("thread_delta") or email.get("prompt_body") or email.get("body")
+
+
+def thread_context(email) -> str:
+    # Open tasks of the thread, as set by threads.prepare()
+    return threads.format_thread_tasks(email.get("thread_tasks") or [])
+
+
+# Everything before the email itself. It must stay first and byte-stable:
+# Ollama reuses the evaluated prefix (KV cache) of a loaded model, so
+# each call only pays for the email-specific suffix.
+EXTRACTION_PREFIX = f"""{PROMPT_PREAMBLE}
+Extract ACTIONABLE TASKS from the email below.
+If no actionable task exists, return EMPTY.
+
+Return STRICT JSON array only:
+{TASK_SCHEMA}
 
 Email:
+"""
+
+
+def build_prompt(email) -> str:
+    prompt = EXTRACTION_PREFIX + f"""Subject: {email.get('subject')}
+Body:
+{prompt_body(email)}
+"""
+
+    # After the email, so the cached prefix stays byte-stable
+    context = thread_context(email)
+    if context:
+        prompt += f"""
+This email is a reply. These tasks are ALREADY TRACKED for its thread;
+do NOT return them again, only tasks that are new in this email:
+{context}
+"""
+
+    return prompt
+
+
+def build_batch_prompt(keyed_emails) -> str:
+    """
+    One prompt for several emails; the preamble and schema are paid once.
+    `keyed_emails` is [(key, email), ...].
+    """
+    sections = "\n".join(
+        f"""### EMAIL {key}
 Subject: {email.get('subject')}
 Body:
-{email.get('body')}
+{prompt_body(email)}
 """
+        for key, email in keyed_emails
+    )
+    keys = ", ".join(f'"{key}"' for key, _ in keyed_emails)
+
+    return f"""{PROMPT_PREAMBLE}
+Extract ACTIONABLE TASKS from EACH email below, independently.
+
+Return a STRICT JSON object only, with exactly these keys: {keys}
+Each value is a JSON array of tasks in this format, or [] if the
+email has no actionable task:
+{TASK_SCHEMA}
 
-    # ---------------- LLM call ----------------
+{sections}"""
+
+
+@contextmanager
+def _metered(tier: str, model: str, prompt: str):
+    """
+    Per-tier latency / token accounting around one LLM call.
+    The body may fill `usage` with token counts and load / prompt-eval
+    seconds (from which warm and cold calls are told apart).
+    """
+    global _last_call_at
+
+    # Each request (even an aborted stream) restarts Ollama's keep-alive
+    _last_call_at = time.monotonic()
+    usage = {}
+    started = time.perf_counter()
     try:
-        response = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False
-            },
-            timeout=60
-        )
+        yield usage
     except Exception:
-        logger.exception("Failed to call Ollama API")
-        raise RuntimeError("Ollama API call failed")
+        llm_metrics.record(tier, model, time.perf_counter() - started, errors=1)
+        raise
+
+    llm_metrics.record(
+        tier,
+        model,
+        time.perf_counter() - started,
+        prompt_chars=len(prompt),
+        **usage
+    )
+
+
+def call_ollama(
+    prompt: str,
+    timeout: float = OLLAMA_TIMEOUT,
+    *,
+    model: str | None = None,
+    tier: str = "extractor",
+    **params
+) -> str:
+    """
+    Send one prompt to Ollama and return the raw generated text.
+    Extra `params` (format, options, ...) go into the request as-is.
+    """
+    model = model or OLLAMA_MODEL
+
+    with _metered(tier, model, prompt) as usage:
+        text, data = _call_ollama(prompt, timeout, model, params)
+        _read_usage(data, usage)
+
+    return text
+
+
+def _read_usage(data: dict, usage: dict):
+    # Ollama reports durations in nanoseconds; prompt_eval_count only
+    # covers tokens not served from the reused prefix
+    usage["prompt_tokens"] = data.get("prompt_eval_count")
+    usage["output_tokens"] = data.get("eval_count")
+    if "load_duration" in data:
+        usage["load_seconds"] = data["load_duration"] / 1e9
+    if "prompt_eval_duration" in data:
+        usage["prompt_eval_seconds"] = data["prompt_eval_duration"] / 1e9
+
+
+def _call_ollama(prompt: str, timeout: float, model: str, params: dict):
+    # Retries, backoff and the circuit breaker live in the shared client
+    response = get_llm_client().post(
+        {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            **params
+        },
+        timeout=timeout
+    )
 
     if response.status_code != 200:
         logger.error("Ollama HTTP error: %s", response.text)
@@ -91,22 +221,314 @@ Body:
         raise RuntimeError(data["error"])
 
     if "response" in data:
-        text = data["response"]
-    elif "message" in data and "content" in data["message"]:
-        text = data["message"]["content"]
-    else:
-        logger.error("Unexpected Ollama response format: %s", data)
-        raise RuntimeError("Unexpected Ollama response format")
+        return data["response"], data
+    if "message" in data and "content" in data["message"]:
+        return data["message"]["content"], data
+
+    logger.error("Unexpected Ollama response format: %s", data)
+    raise RuntimeError("Unexpected Ollama response format")
+
+
+def iter_ollama_tasks(
+    prompt: str,
+    timeout: float = OLLAMA_TIMEOUT,
+    *,
+    model: str | None = None,
+    tier: str = "extractor"
+):
+    """
+    Streaming variant of call_ollama() + parse_task_output().
+
+    Yields each task dict as soon as its object closes in the token
+    stream. Generation is cut off (connection closed) as soon as the
+    model says EMPTY, closes the array, or emits output that cannot
+    become a valid task array. `timeout` bounds the whole generation.
+    """
+    model = model or OLLAMA_MODEL
+
+    with _metered(tier, model, prompt) as usage:
+        yield from _stream_ollama_tasks(prompt, timeout, model, usage)
+
+
+def _is_read_timeout(exc: Exception) -> bool:
+    # requests re-raises a read timeout inside iter_lines() as ConnectionError
+    return isinstance(exc, requests.ReadTimeout) or any(
+        isinstance(arg, ReadTimeoutError) for arg in exc.args
+    )
+
+
+def _stream_ollama_tasks(prompt: str, timeout: float, model: str, usage: dict):
+    deadline = time.monotonic() + timeout
+    parser = TaskArrayParser()
+
+    response = get_llm_client().post(
+        {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE
+        },
+        timeout=timeout,
+        stream=True
+    )
+
+    # Closing the response aborts generation on the Ollama side
+    with response:
+        if response.status_code != 200:
+            logger.error("Ollama HTTP error: %s", response.text)
+            raise RuntimeError(response.text)
+
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+
+                try:
+                    chunk = json.loads(line)
+                except ValueError:
+                    logger.error("Ollama returned non-JSON stream line: %s", line)
+                    raise RuntimeError("Invalid Ollama response")
+
+                if "error" in chunk:
+                    logger.error("Ollama error: %s", chunk["error"])
+                    raise RuntimeError(chunk["error"])
+
+                token = chunk.get("response")
+                if token is None:
+                    token = (chunk.get("message") or {}).get("content", "")
+
+                try:
+                    yield from parser.feed(token)
+                except InvalidStream as exc:
+                    logger.error("Aborting extraction, invalid LLM output: %s", exc)
+                    raise RuntimeError("Invalid task JSON")
+
+                if chunk.get("done"):
+                    _read_usage(chunk, usage)
+
+                if parser.done or chunk.get("done"):
+                    break
+
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Ollama generation timed out")
+        except requests.RequestException as exc:
+            if _is_read_timeout(exc):
+                # Slow generation, not an outage: fail this email only
+                raise RuntimeError("Ollama generation timed out") from exc
+            # Connection dropped mid-generation: same as an outage
+            get_llm_client().breaker.record_failure()
+            raise LLMUnavailable(f"Ollama stream failed: {exc}") from exc
+
+    try:
+        parser.close()
+    except InvalidStream as exc:
+        logger.error("Incomplete LLM output: %s", exc)
+        raise RuntimeError("Invalid task JSON")
+
+
+def generate_tasks(prompt: str, timeout: float = OLLAMA_TIMEOUT) -> list:
+    """
+    Raw task array for a single-email prompt (streamed unless OLLAMA_STREAM=false).
+    """
+    if OLLAMA_STREAM:
+        return list(iter_ollama_tasks(prompt, timeout=timeout))
+
+    return parse_task_output(call_ollama(prompt, timeout=timeout))
+
+
+# =========================================================
+# Keep-alive / Prefix Warm-up
+# =========================================================
+
+_last_call_at = 0.0
+_warm_lock = threading.Lock()
+
+
+def keep_alive_seconds(value: str = OLLAMA_KEEP_ALIVE) -> float:
+    """
+    "30m" / "1h" / "45s" / "300" → seconds; negative means forever.
+    """
+    value = (value or "").strip().lower()
+    units = {"s": 1, "m": 60, "h": 3600}
+    try:
+        if value and value[-1] in units:
+            return float(value[:-1]) * units[value[-1]]
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def warm_up(timeout: float = OLLAMA_TIMEOUT):
+    """
+    Load the model(s) and evaluate each one's static prompt prefix
+    once, so the next email is served warm.
+    """
+    prefixes = [(OLLAMA_MODEL, EXTRACTION_PREFIX)]
+    if OLLAMA_CLASSIFIER_MODEL:
+        prefixes.append((OLLAMA_CLASSIFIER_MODEL, CLASSIFIER_PREFIX))
+    models = [model for model, _ in prefixes]
+
+    for model, prefix in prefixes:
+        try:
+            call_ollama(
+                prefix,
+                timeout=timeout,
+                model=model,
+                tier="warmup",
+                options={"num_predict": 1}
+            )
+        except Exception:
+            logger.warning("Warm-up of model %s failed", model, exc_info=True)
+            return
+
+    logger.info("🔥 Warmed up %s", ", ".join(models))
+
+
+def ensure_warm():
+    """
+    Warm up in the background if the model has probably been unloaded
+    (no call within OLLAMA_KEEP_ALIVE); overlaps the load with IMAP fetch.
+    """
+    keep_alive = keep_alive_seconds()
+    idle = time.monotonic() - _last_call_at
+
+    if keep_alive < 0 and _last_call_at:
+        return
+    if _last_call_at and idle < keep_alive:
+        return
+    if not _warm_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            warm_up()
+        finally:
+            _warm_lock.release()
+
+    threading.Thread(target=run, name="llm-warmup", daemon=True).start()
 
+# =========================================================
+# Model Cascade
+# =========================================================
+
+# The classifier only needs the gist of the email
+CLASSIFIER_BODY_CHARS = 1500
+
+
+def cascade_enabled() -> bool:
+    return bool(OLLAMA_CLASSIFIER_MODEL)
+
+
+def cache_model() -> str:
+    # Cached answers depend on the whole cascade, not just the extractor
+    if cascade_enabled():
+        return f"{OLLAMA_CLASSIFIER_MODEL}>{OLLAMA_MODEL}@{CASCADE_THRESHOLD}"
+    return OLLAMA_MODEL
+
+
+# Static part of every classifier prompt (warmed like EXTRACTION_PREFIX)
+CLASSIFIER_PREFIX = """
+Does the email below ask Ras Dwivedi (CTO, C3I Hub) or the CTO office
+to DO something: a request, decision, approval, review or deadline?
+FYI notes, newsletters, acknowledgements and status updates are NOT actionable.
+
+Return STRICT JSON only:
+{"actionable": true/false, "confidence": 0.0-1.0}
+
+Email:
+"""
+
+
+def build_classifier_prompt(email) -> str:
+    return CLASSIFIER_PREFIX + f"""Subject: {email.get('subject')}
+Body:
+{(prompt_body(email) or '')[:CLASSIFIER_BODY_CHARS]}
+"""
+
+
+def classify_actionable(email, timeout: float = OLLAMA_TIMEOUT) -> dict:
+    """
+    First cascade tier: cheap actionable / not-actionable screen.
+
+    An unusable classifier answer fails open (the email is extracted);
+    an Ollama outage (LLMUnavailable) is raised like any other call.
+
+    Returns:
+        dict: cascade decision, kept on every task it lets through
+    """
+    score = None
+
+    try:
+        text = call_ollama(
+            build_classifier_prompt(email),
+            timeout=min(timeout, CASCADE_CLASSIFIER_TIMEOUT),
+            model=OLLAMA_CLASSIFIER_MODEL,
+            tier="classifier",
+            format="json",
+            options={"temperature": 0, "num_predict": 32}
+        )
+        data = json.loads(text)
+        confidence = min(1.0, max(0.0, float(data.get("confidence", 1.0))))
+        score = confidence if data.get("actionable") else 1 - confidence
+    except LLMUnavailable:
+        raise
+    except Exception:
+        logger.warning(
+            "Classifier gave no usable answer for email UID=%s; extracting anyway",
+            email.get("uid")
+        )
+
+    actionable = score is None or score >= CASCADE_THRESHOLD
+    llm_metrics.count(
+        "classifier",
+        positives=int(actionable),
+        negatives=int(not actionable)
+    )
+
+    return {
+        "classifier_model": OLLAMA_CLASSIFIER_MODEL,
+        "score": round(score, 3) if score is not None else None,
+        "threshold": CASCADE_THRESHOLD,
+        "actionable": actionable,
+        "extractor_model": OLLAMA_MODEL if actionable else None,
+    }
+
+
+def cascade_tasks(email, timeout: float = OLLAMA_TIMEOUT) -> list:
+    """
+    Raw task array for one email, through the cascade when enabled.
+    """
+    if not cascade_enabled():
+        return generate_tasks(build_prompt(email), timeout=timeout)
+
+    decision = classify_actionable(email, timeout=timeout)
+    if not decision["actionable"]:
+        logger.info(
+            "Classifier: email UID=%s not actionable (score=%s)",
+            email.get("uid"),
+            decision["score"]
+        )
+        return []
+
+    tasks = generate_tasks(build_prompt(email), timeout=timeout)
+    for task in tasks:
+        task["cascade"] = decision
+
+    return tasks
+
+
+def parse_task_output(text: str) -> list:
     if not text or "EMPTY" in text:
         return []
 
     try:
-        tasks = json.loads(text)
+        return json.loads(text)
     except Exception:
         logger.error("Failed to parse task JSON from LLM output:\n%s", text)
         raise RuntimeError("Invalid task JSON")
 
+
+def enrich_tasks(tasks: list, email) -> list:
     now = datetime.utcnow().isoformat()
 
     # ---------------- Enrich tasks (NO IDENTITY) ----------------
@@ -116,6 +538,9 @@ Body:
 
         # ---- Email provenance ----
         task["email_uid"] = email.get("uid")
+        task["email_fingerprint"] = email.get("fingerprint")
+        task["email_folder"] = email.get("folder")
+        task["thread_id"] = email.get("thread_id")
         task["email_subject"] = email.get("subject")
         task["email_from"] = email.get("from")
         task["source"] = "email"
@@ -129,6 +554,44 @@ Body:
         task["last_activity_at"] = now
         task.setdefault("status", "OPEN")
 
+    return tasks
+
+
+def extraction_key(email) -> str:
+    return extraction_cache.make_key(
+        cache_model(),
+        PROMPT_VERSION,
+        email.get("subject"),
+        prompt_body(email),
+        thread_context(email)
+    )
+
+
+def extract_tasks(email, timeout: float = OLLAMA_TIMEOUT):
+    """
+    Extract actionable tasks from an email using Ollama.
+
+    Responsibilities:
+    - Call LLM for task extraction ONLY
+    - Send replies as their thread delta, with the thread's open tasks
+    - Reuse cached LLM output for content already extracted
+    - Enrich tasks with deterministic metadata
+    - NEVER generate task_id
+    - NEVER write to DB (except the extraction cache)
+    """
+
+    threads.prepare(email)
+    cache_key = extraction_key(email)
+
+    tasks = extraction_cache.get(cache_key)
+
+    if tasks is None:
+        tasks = cascade_tasks(email, timeout=timeout)
+        extraction_cache.put(cache_key, tasks, model=cache_model())
+
+    tasks = threads.drop_known_tasks(tasks, email.get("thread_tasks"))
+    enrich_tasks(tasks, email)
+
     logger.info(
         "Extracted %d task(s) from email UID=%s",
         len(tasks),
@@ -136,3 +599,221 @@ Body:
     )
 
     return tasks
+
+
+# =========================================================
+# Batched Extraction
+# =========================================================
+
+def estimate_tokens(email) -> int:
+    # ~4 characters per token is close enough for budgeting
+    text = f"{email.get('subject') or ''}\n{prompt_body(email) or ''}"
+    return len(text) // 4 + 1
+
+
+def pack_batches(
+    emails,
+    token_budget: int = LLM_BATCH_TOKEN_BUDGET,
+    max_emails: int = LLM_BATCH_MAX_EMAILS,
+):
+    """
+    Group short emails into batches under `token_budget`.
+
+    Returns:
+        (batches, singles): long emails and replies with thread
+        context are returned in `singles`
+    """
+    batches, singles = [], []
+    current, current_tokens, current_uids = [], 0, set()
+
+    for email in emails:
+        tokens = estimate_tokens(email)
+
+        if tokens > LLM_BATCH_SHORT_EMAIL_TOKENS or email.get("thread_tasks"):
+            singles.append(email)
+            continue
+
+        uid = str(email.get("uid"))
+        if current and (
+            current_tokens + tokens > token_budget
+            or len(current) >= max_emails
+            or uid in current_uids
+        ):
+            batches.append(current)
+            current, current_tokens, current_uids = [], 0, set()
+
+        current.append(email)
+        current_tokens += tokens
+        current_uids.add(uid)
+
+    if current:
+        batches.append(current)
+
+    return batches, singles
+
+
+def _parse_batch_output(text: str):
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):]
+
+    try:
+        data = json.loads(text)
+    except Exception:
+        return None
+
+    return data if isinstance(data, dict) else None
+
+
+def _extract_raw_batch(emails, timeout: float, errors: dict) -> dict:
+    """
+    Raw (unenriched) task arrays for `emails`, keyed by id(email).
+    A batch whose output is unusable is split in half and retried;
+    a lone email falls back to the single-email prompt, and if that
+    fails too its error goes into `errors` (keyed by id(email)) without
+    affecting the rest. LLMUnavailable is raised.
+    """
+    if len(emails) == 1:
+        email = emails[0]
+        try:
+            return {id(email): generate_tasks(build_prompt(email), timeout=timeout)}
+        except LLMUnavailable:
+            raise
+        except Exception as exc:
+            logger.error("Extraction failed for email UID=%s: %s", email.get("uid"), exc)
+            errors[id(email)] = exc
+            return {}
+
+    keyed = [(str(email.get("uid")), email) for email in emails]
+    try:
+        data = _parse_batch_output(
+            call_ollama(build_batch_prompt(keyed), timeout=timeout)
+        ) or {}
+    except LLMUnavailable:
+        raise
+    except Exception as exc:
+        # e.g. a read timeout on the whole batch: smaller prompts may pass
+        logger.warning("Batch prompt failed (%s); splitting", exc)
+        data = {}
+
+    results = {}
+    retry = []
+    for key, email in keyed:
+        value = data.get(key)
+        if value == "EMPTY":
+            value = []
+        if isinstance(value, list) and all(isinstance(t, dict) for t in value):
+            results[id(email)] = value
+        else:
+            retry.append(email)
+
+    if retry:
+        logger.warning(
+            "Batch extraction failed for %d of %d email(s); splitting",
+            len(retry),
+            len(emails)
+        )
+        if len(retry) == len(emails):
+            mid = len(retry) // 2
+            halves = [retry[:mid], retry[mid:]]
+        else:
+            halves = [retry]
+
+        for half in halves:
+            results.update(_extract_raw_batch(half, timeout, errors))
+
+    return results
+
+
+def extract_tasks_batch(emails, timeout: float = OLLAMA_TIMEOUT) -> list:
+    """
+    Extract tasks for several emails with as few LLM calls as possible.
+
+    - Cached emails cost nothing
+    - With the cascade enabled, emails the classifier rejects never
+      reach the extraction model
+    - Short emails are packed into one prompt per token budget
+    - Long emails use the normal single-email prompt
+
+    Returns:
+        list of (email, tasks, error), in input order;
+        exactly one of tasks / error is None
+    """
+    emails = list(emails)
+    raw = {}
+    keys = {}
+
+    for email in emails:
+        threads.prepare(email)
+        keys[id(email)] = extraction_key(email)
+        cached = extraction_cache.get(keys[id(email)])
+        if cached is not None:
+            raw[id(email)] = cached
+
+    pending = [email for email in emails if id(email) not in raw]
+    errors = {}
+    decisions = {}
+
+    if cascade_enabled():
+        screened = []
+        for email in pending:
+            try:
+                decision = classify_actionable(email, timeout=timeout)
+            except LLMUnavailable:
+                # An outage is the caller's to wait out, not a per-email error
+                raise
+            except Exception as exc:
+                errors[id(email)] = exc
+                continue
+
+            if decision["actionable"]:
+                decisions[id(email)] = decision
+                screened.append(email)
+            else:
+                raw[id(email)] = []
+                extraction_cache.put(keys[id(email)], [], model=cache_model())
+        pending = screened
+
+    batches, singles = pack_batches(pending)
+
+    for group in batches + [[email] for email in singles]:
+        try:
+            results = _extract_raw_batch(group, timeout, errors)
+        except LLMUnavailable:
+            raise
+        except Exception as exc:
+            logger.exception(
+                "Batch extraction failed for email UID(s) %s",
+                [email.get("uid") for email in group]
+            )
+            for email in group:
+                errors[id(email)] = exc
+            continue
+
+        for email in group:
+            if id(email) not in results:
+                continue
+            tasks = results[id(email)]
+            for task in tasks:
+                if id(email) in decisions:
+                    task["cascade"] = decisions[id(email)]
+            extraction_cache.put(keys[id(email)], tasks, model=cache_model())
+            raw[id(email)] = tasks
+
+    out = []
+    for email in emails:
+        if id(email) in errors:
+            out.append((email, None, errors[id(email)]))
+            continue
+
+        tasks = threads.drop_known_tasks(raw[id(email)], email.get("thread_tasks"))
+        tasks = enrich_tasks(tasks, email)
+        logger.info(
+            "Extracted %d task(s) from email UID=%s",
+            len(tasks),
+            email.get("uid")
+        )
+        out.append((email, tasks, None))
+
+    return out
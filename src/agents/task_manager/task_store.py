@@ -1,50 +1,198 @@
+import logging
 from datetime import datetime
-import uuid
-from src.db import get_collection
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.db import get_collection, ensure_indexes
+from src.agents.task_manager.utils.task_id import generate_task_id, normalize
+from src.agents.task_manager.utils.task_dedupe import band_keys, merge_new_tasks
+
+logger = logging.getLogger("agent.task_manager.task_store")
 
 tasks_col = get_collection("tasks")
 
+# Owned by the stored document once it exists; replays never rewrite them
+INSERT_ONLY_FIELDS = ("task_id", "created_at", "status")
+
+DUPLICATE_KEY = 11000
+
+
+def identity(task) -> dict:
+    # Matches the partial filter of the task_email_identity index
+    return {
+        "source": "email",
+        "email_fingerprint": task["email_fingerprint"],
+        "title_key": task["title_key"]
+    }
+
+
+def legacy_identity(task) -> dict:
+    # Tasks stored before email_fingerprint, keyed by the folder-local
+    # UID; subject + sender keep another folder's same-UID email out
+    return {
+        "source": "email",
+        "email_uid": task.get("email_uid"),
+        "title": task.get("title"),
+        "email_subject": task.get("email_subject"),
+        "email_from": task.get("email_from"),
+        "email_fingerprint": {"$exists": False}
+    }
+
+
+def _bulk_write_each(ops) -> tuple:
+    """
+    Ordered bulk_write that carries on past a failing op instead of
+    dropping the rest. An op failing with E11000 is retried once: an
+    upsert that lost an insert race then matches the winner's document.
+
+    Returns:
+        (set of upserted op indexes, {op index: error message})
+    """
+    upserted, errors, retried = set(), {}, set()
+    start = 0
+
+    while start < len(ops):
+        try:
+            result = tasks_col.bulk_write(ops[start:], ordered=True)
+        except BulkWriteError as exc:
+            details = exc.details
+            upserted |= {start + u["index"] for u in details.get("upserted", [])}
+
+            error = details["writeErrors"][0]
+            idx = start + error["index"]
+            if error.get("code") == DUPLICATE_KEY and idx not in retried:
+                retried.add(idx)
+                start = idx
+            else:
+                errors[idx] = error.get("errmsg", str(error))
+                start = idx + 1
+            continue
+
+        upserted |= {start + idx for idx in result.upserted_ids}
+        break
+
+    return upserted, errors
+
 
 def store_task(tasks):
     """
-    Store one or more tasks idempotently.
+    Store one or more tasks idempotently, in one round trip.
     Ensures every task has a stable task_id.
+
+    - identity is (email fingerprint, normalized title), so the same
+      message imported from any folder maps to the same task
+    - task_id is derived from that identity (generate_task_id), so
+      replays and parallel workers compute the same ID
+    - a task stored before fingerprints existed is adopted (stamped with
+      the new identity) in the same round trip, keeping its task_id
+    - task_id / created_at / status are only written on insert; an
+      existing task keeps its ID (and its CF edges) and its status
+    - `task["task_id"]` is set to the stored ID in every case
+    - a new task that near-duplicates an OPEN task from another email is
+      linked to it (duplicate_of=<canonical task_id>, status unchanged)
+    - a write error affects only its own task (`error` is set)
+
+    Returns:
+        list: one {task_id, title, inserted, duplicate_of, error} per task,
+              in input order (inserted=False → an existing task was updated)
     """
 
     if isinstance(tasks, dict):
         tasks = [tasks]
 
+    if not tasks:
+        return []
+
+    # Unique (email_fingerprint, title_key) index → each upsert is an index lookup
+    ensure_indexes()
+
     now = datetime.utcnow().isoformat()
+    ops = []
 
     for task in tasks:
         # Never reuse Mongo _id
         task.pop("_id", None)
 
+        # Fingerprint is set by enrich_tasks; the UID is a last resort
+        task["email_fingerprint"] = task.get("email_fingerprint") or f"uid:{task.get('email_uid')}"
+        task["title_key"] = normalize(task.get("title") or "")
+
         # -------------------------------------------------
         # 🔑 ENSURE TASK ID (SOURCE OF TRUTH)
         # -------------------------------------------------
         if not task.get("task_id"):
-            task["task_id"] = f"TASK-{uuid.uuid4().hex[:8]}"
+            task["task_id"] = generate_task_id(
+                task.get("project_id") or "UNASSIGNED",
+                task.get("task_verb") or "ops",
+                task.get("title") or "",
+                source=task["email_fingerprint"]
+            )
 
         # Ensure timestamps & defaults
-        created_at = task.get("created_at", now)
+        task["source"] = "email"
+        task.setdefault("created_at", now)
         task["last_activity_at"] = now
         task.setdefault("status", "OPEN")
+        task["dedupe_bands"] = band_keys(task)
 
-        # Avoid updating created_at on existing docs
-        task_without_created = dict(task)
-        task_without_created.pop("created_at", None)
+        on_insert = {field: task[field] for field in INSERT_ONLY_FIELDS}
+        updates = {k: v for k, v in task.items() if k not in INSERT_ONLY_FIELDS}
 
-        tasks_col.update_one(
+        # Ordered: a legacy doc is stamped first, so the upsert finds it
+        ops.append(UpdateOne(
+            legacy_identity(task),
+            {"$set": {"email_fingerprint": task["email_fingerprint"], "title_key": task["title_key"]}}
+        ))
+        ops.append(UpdateOne(
+            identity(task),
             {
-                "email_uid": task.get("email_uid"),
-                "title": task.get("title")
-            },
-            {
-                "$set": task_without_created,
-                "$setOnInsert": {
-                    "created_at": created_at
-                }
+                "$set": updates,
+                "$setOnInsert": on_insert
             },
             upsert=True
-        )
+        ))
+
+    upserted, op_errors = _bulk_write_each(ops)
+
+    # Two ops per task; the upsert is the second
+    inserted = {op_idx // 2 for op_idx in upserted}
+    failed = {}
+    for op_idx, error in op_errors.items():
+        task = tasks[op_idx // 2]
+        if op_idx % 2:
+            failed[op_idx // 2] = error
+            logger.error("❌ Could not store task '%s': %s", task.get("title"), error)
+        else:
+            # The new identity is already taken: leave the legacy doc be
+            logger.warning("⚠️ Legacy task '%s' not adopted: %s", task.get("title"), error)
+
+    # Existing tasks may predate deterministic IDs: report the stored one
+    existing = [task for idx, task in enumerate(tasks) if idx not in inserted and idx not in failed]
+    if existing:
+        stored = {
+            (doc.get("email_fingerprint"), doc.get("title_key")): doc
+            for doc in tasks_col.find(
+                {"$or": [identity(task) for task in existing]},
+                {"_id": 0, "email_fingerprint": 1, "title_key": 1, "task_id": 1, "status": 1, "duplicate_of": 1}
+            )
+        }
+        for task in existing:
+            doc = stored.get((task["email_fingerprint"], task["title_key"]))
+            if doc:
+                task["task_id"] = doc.get("task_id") or task["task_id"]
+                task["status"] = doc.get("status", task["status"])
+                task["duplicate_of"] = doc.get("duplicate_of")
+
+    merged = merge_new_tasks([task for idx, task in enumerate(tasks) if idx in inserted])
+
+    return [
+        {
+            "task_id": task["task_id"],
+            "title": task.get("title"),
+            "inserted": idx in inserted,
+            "duplicate_of": merged.get(task["task_id"]) or task.get("duplicate_of"),
+            "error": failed.get(idx),
+        }
+        for idx, task in enumerate(tasks)
+    ]
@@ -0,0 +1,240 @@
+import re
+
+from src.config.config import PROMPT_BODY_MAX_TOKENS
+
+# =========================================================
+# Configuration
+# =========================================================
+
+# Same ~4 chars/token heuristic the batch packer uses
+CHARS_PER_TOKEN = 4
+
+# Below this, a reduced body is assumed to have lost the message
+# (e.g. a bare forward) and the original is used instead
+MIN_REDUCED_CHARS = 20
+
+# Share of an over-budget excerpt kept from the start (rest from the end)
+EXCERPT_HEAD_SHARE = 0.8
+
+# =========================================================
+# Patterns
+# =========================================================
+
+REPLY_MARKERS = [
+    # Gmail / Apple Mail: "On Mon, 1 Jan 2024 at 10:00, X <x@y> wrote:"
+    # (the attribution line may be wrapped once)
+    re.compile(r"^On\b[^\n]{0,200}(\n[^\n]{0,100})?\bwrote:\s*$", re.IGNORECASE | re.MULTILINE),
+    # Outlook
+    re.compile(r"^-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^_{10,}\s*\n\s*From:.*\n\s*(Sent|Date):", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^From:.*\n\s*Sent:.*\n", re.IGNORECASE | re.MULTILINE),
+]
+
+FORWARD_MARKER = re.compile(
+    r"^\s*(-{2,}\s*Forwarded message\s*-{2,}|Begin forwarded message:)\s*$",
+    re.IGNORECASE
+)
+FORWARD_HEADER = re.compile(r"^\s*(From|Date|Sent|To|Cc|Subject|Reply-To):", re.IGNORECASE)
+
+SIGNATURE_DELIMITER = re.compile(r"^--\s*$")
+MOBILE_SIGNATURE = re.compile(r"^\s*Sent from my \w+", re.IGNORECASE)
+SIGN_OFF = re.compile(
+    r"^\s*(best|kind|warm)?\s*(regards|thanks|thank you|cheers|sincerely)"
+    r"( and regards| & regards)?\s*,?\s*$",
+    re.IGNORECASE
+)
+# Lines after a sign-off this short are taken to be a signature block
+SIGNATURE_MAX_LINES = 8
+
+# ...but only if every one of them looks like a signature line
+SIGNATURE_LINE_MAX_CHARS = 60
+SIGNATURE_LINE_MAX_WORDS = 6
+SIGNATURE_CONTACT = re.compile(
+    r"(https?://|www\.|\S+@\S+\.\w+|(\+|\b(tel|ph|phone|mob|mobile|m|t)\b\W*)?\d[\d\s().-]{6,}\d)",
+    re.IGNORECASE
+)
+REQUEST_WORDS = re.compile(
+    r"^\W*(please|pls|kindly|also|can|could|would|will|let|send|share|approve|review|"
+    r"sign|schedule|submit|confirm|check|call|update|prepare|ensure|make|need|do|don't|"
+    r"remember|follow)\b",
+    re.IGNORECASE
+)
+
+DISCLAIMER_TERMS = re.compile(
+    r"confidential|privileged|intended recipient|intended solely|disclaimer|"
+    r"unauthori[sz]ed|prohibited|virus|notify the sender|delete (this|the) (e-?mail|message)",
+    re.IGNORECASE
+)
+
+# =========================================================
+# Stripping Steps
+# Each takes text and returns (text, removed_chars).
+# =========================================================
+
+def strip_quoted_history(text: str):
+    cut = len(text)
+    for marker in REPLY_MARKERS:
+        match = marker.search(text)
+        if match:
+            cut = min(cut, match.start())
+
+    kept = [
+        line for line in text[:cut].split("\n")
+        if not line.lstrip().startswith(">")
+    ]
+    reduced = "\n".join(kept)
+    return reduced, len(text) - len(reduced)
+
+
+def strip_forward_headers(text: str):
+    out = []
+    in_headers = False
+
+    for line in text.split("\n"):
+        if FORWARD_MARKER.match(line):
+            in_headers = True
+            continue
+
+        if in_headers:
+            if FORWARD_HEADER.match(line):
+                continue
+            if not line.strip():
+                in_headers = False
+                continue
+            in_headers = False
+
+        out.append(line)
+
+    reduced = "\n".join(out)
+    return reduced, len(text) - len(reduced)
+
+
+def is_signature_line(line: str) -> bool:
+    """
+    Name / title / company / phone / URL - not a sentence or a request.
+
+    >>> is_signature_line("Anil Kumar")
+    True
+    >>> is_signature_line("Head of Procurement, C3I Hub")
+    True
+    >>> is_signature_line("+91 98765 43210")
+    True
+    >>> is_signature_line("Also sign the MoU.")
+    False
+    >>> is_signature_line("Please approve the PO for the lab servers by Monday.")
+    False
+    """
+    line = line.strip()
+    if not line:
+        return True
+    if SIGNATURE_CONTACT.search(line) and len(line) <= SIGNATURE_LINE_MAX_CHARS:
+        return True
+    if len(line) > SIGNATURE_LINE_MAX_CHARS or len(line.split()) > SIGNATURE_LINE_MAX_WORDS:
+        return False
+    if REQUEST_WORDS.match(line):
+        return False
+    # Sentence punctuation (initials like "Dr." or "Ph.D." are fine)
+    return not re.search(r"[?!;]|\w{3,}\.(\s|$)", line)
+
+
+def strip_signature(text: str):
+    r"""
+    Drop "--" / "Sent from my ..." blocks and the signature after a
+    closing sign-off. A sign-off followed by real content is kept whole.
+
+    >>> strip_signature("Please review the SOP.\n\nRegards,\nAnil Kumar\nCTO Office\n+91 98765 43210")[0]
+    'Please review the SOP.\n\nRegards,'
+    >>> strip_signature("Hi Ras, hope you are doing well this week.\n\nThanks,\n"
+    ...                 "Please approve the PO for the lab servers by Monday.\n"
+    ...                 "Also sign the MoU.\nAnil")[0].endswith("Also sign the MoU.\nAnil")
+    True
+    >>> strip_signature("Thanks, that helps.\nCan you send the deck?")[1]
+    0
+    """
+    lines = text.split("\n")
+
+    for idx, line in enumerate(lines):
+        if SIGNATURE_DELIMITER.match(line) or MOBILE_SIGNATURE.match(line):
+            lines = lines[:idx]
+            break
+
+    # "Regards,\nName\nTitle\nPhone" at the very end: keep the sign-off only
+    for idx in range(len(lines) - 1, max(-1, len(lines) - SIGNATURE_MAX_LINES - 2), -1):
+        if SIGN_OFF.match(lines[idx]):
+            if all(is_signature_line(line) for line in lines[idx + 1:]):
+                lines = lines[:idx + 1]
+            break
+
+    reduced = "\n".join(lines)
+    return reduced, len(text) - len(reduced)
+
+
+def strip_disclaimers(text: str):
+    paragraphs = re.split(r"\n\s*\n", text)
+    kept = [
+        p for p in paragraphs
+        if len(DISCLAIMER_TERMS.findall(p)) < 2
+    ]
+    reduced = "\n\n".join(kept)
+    return reduced, len(text) - len(reduced)
+
+
+def excerpt(text: str, max_chars: int) -> str:
+    """
+    Head + tail of `text` within `max_chars`; asks usually sit at the
+    top, deadlines and sign-off requests at the bottom.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    marker = "\n[…]\n"
+    budget = max(0, max_chars - len(marker))
+    head = int(budget * EXCERPT_HEAD_SHARE)
+    tail = budget - head
+
+    return text[:head].rstrip() + marker + (text[-tail:].lstrip() if tail else "")
+
+# =========================================================
+# Public API
+# =========================================================
+
+# Forward headers go first so a forwarded "From:/Sent:" block is not
+# mistaken for quoted reply history
+STEPS = [
+    ("forward_headers", strip_forward_headers),
+    ("quoted", strip_quoted_history),
+    ("signature", strip_signature),
+    ("disclaimer", strip_disclaimers),
+]
+
+
+def reduce_body(body: str, max_tokens: int = PROMPT_BODY_MAX_TOKENS):
+    """
+    Shrink an email body to what the extractor needs to see.
+
+    Returns:
+        (prompt_body, body_stats) where body_stats is
+        {original_chars, reduced_chars, removed: {step: chars}}
+    """
+    original = (body or "").replace("\r\n", "\n")
+    text = original
+    removed = {}
+
+    for name, step in STEPS:
+        text, dropped = step(text)
+        if dropped:
+            removed[name] = dropped
+
+    text = re.sub(r"\n{3,}", "\n\n", text).strip()
+
+    if len(text) < MIN_REDUCED_CHARS:
+        text = original.strip()
+        removed = {}
+
+    text = excerpt(text, max_tokens * CHARS_PER_TOKEN)
+
+    return text, {
+        "original_chars": len(original),
+        "reduced_chars": len(text),
+        "removed": removed,
+    }
@@ -0,0 +1,225 @@
+import copy
+import json
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+
+from src.db import get_collection, ensure_indexes
+from src.config.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_ENTRIES,
+)
+
+logger = logging.getLogger("extraction_cache")
+
+# =========================================================
+# Configuration
+# =========================================================
+
+# Size-based eviction is checked every N stores, not on every write
+EVICTION_CHECK_EVERY = 100
+
+STATS_ID = "extraction_cache"
+
+# Counters are buffered in-process and flushed to Mongo this often
+# (in events or seconds, whichever comes first) and at exit
+STATS_FLUSH_EVERY = 50
+STATS_FLUSH_SECONDS = 30
+
+# =========================================================
+# DB Collections (owned here)
+# =========================================================
+
+cache_col = get_collection("llm_extraction_cache")
+stats_col = get_collection("llm_cache_stats")
+
+# =========================================================
+# In-process Counters
+# =========================================================
+
+_lock = threading.Lock()
+_stores_since_check = 0
+
+stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+# Not yet written to stats_col
+_pending = {}
+_pending_events = 0
+_flushed_at = time.monotonic()
+
+
+def _count(field: str, n: int = 1):
+    global _pending_events
+
+    with _lock:
+        stats[field] += n
+        _pending[field] = _pending.get(field, 0) + n
+        _pending_events += 1
+        due = (
+            _pending_events >= STATS_FLUSH_EVERY
+            or time.monotonic() - _flushed_at >= STATS_FLUSH_SECONDS
+        )
+
+    if due:
+        flush_stats()
+
+
+def flush_stats():
+    """
+    Add the buffered counters to the shared (all-process) totals.
+    """
+    global _pending, _pending_events, _flushed_at
+
+    with _lock:
+        pending, _pending = _pending, {}
+        _pending_events = 0
+        _flushed_at = time.monotonic()
+
+    if pending:
+        stats_col.update_one({"_id": STATS_ID}, {"$inc": pending}, upsert=True)
+
+
+atexit.register(flush_stats)
+
+
+# =========================================================
+# Public API
+# =========================================================
+
+def make_key(model, prompt_version, subject, body, context: str = "") -> str:
+    """
+    Content address of one extraction: same model, same prompt
+    template and same email content → same LLM answer.
+    `context` (thread tasks shown to the model) only enters the key
+    when present, so keys of standalone emails are unchanged.
+    """
+    parts = [model, prompt_version, subject or "", body or ""]
+    if context:
+        parts.append(context)
+
+    basis = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(basis.encode("utf-8")).hexdigest()
+
+
+def get(key: str):
+    """
+    Returns:
+        list | None: a private copy of the cached task array, or None on a miss
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+
+    doc = cache_col.find_one_and_update(
+        {"_id": key},
+        {
+            "$set": {"last_used_at": datetime.now(timezone.utc)},
+            "$inc": {"hits": 1}
+        },
+        projection={"tasks": 1}
+    )
+
+    if doc is None:
+        _count("misses")
+        return None
+
+    _count("hits")
+    return copy.deepcopy(doc["tasks"])
+
+
+def put(key: str, tasks: list, *, model: str | None = None):
+    """
+    Store the raw (pre-enrichment) task array for `key`.
+    """
+    global _stores_since_check
+
+    if not LLM_CACHE_ENABLED:
+        return
+
+    # Includes the created_at TTL index (age-based eviction)
+    ensure_indexes()
+
+    now = datetime.now(timezone.utc)
+    cache_col.update_one(
+        {"_id": key},
+        {
+            "$set": {
+                "tasks": copy.deepcopy(tasks),
+                "model": model,
+                "last_used_at": now
+            },
+            "$setOnInsert": {"created_at": now, "hits": 0}
+        },
+        upsert=True
+    )
+    _count("stores")
+
+    with _lock:
+        _stores_since_check += 1
+        due = _stores_since_check >= EVICTION_CHECK_EVERY
+        if due:
+            _stores_since_check = 0
+
+    if due:
+        evict_overflow()
+
+
+def evict_overflow() -> int:
+    """
+    Trim least-recently-used entries down to LLM_CACHE_MAX_ENTRIES.
+    """
+    overflow = cache_col.estimated_document_count() - LLM_CACHE_MAX_ENTRIES
+    if overflow <= 0:
+        return 0
+
+    stale_ids = [
+        doc["_id"]
+        for doc in cache_col.find({}, {"_id": 1})
+        .sort("last_used_at", 1)
+        .limit(overflow)
+    ]
+
+    deleted = cache_col.delete_many({"_id": {"$in": stale_ids}}).deleted_count
+    if deleted:
+        _count("evictions", deleted)
+        logger.info("Evicted %d extraction cache entr(ies)", deleted)
+
+    return deleted
+
+
+def cache_stats() -> dict:
+    """
+    Lifetime counters (all processes) plus current size.
+    """
+    flush_stats()
+    totals = stats_col.find_one({"_id": STATS_ID}) or {}
+    totals.pop("_id", None)
+
+    lookups = totals.get("hits", 0) + totals.get("misses", 0)
+
+    return {
+        "entries": cache_col.estimated_document_count(),
+        "hits": totals.get("hits", 0),
+        "misses": totals.get("misses", 0),
+        "stores": totals.get("stores", 0),
+        "evictions": totals.get("evictions", 0),
+        "hit_rate": round(totals.get("hits", 0) / lookups, 3) if lookups else None,
+    }
+
+
+def main():
+    s = cache_stats()
+
+    print("\n🗄️ LLM Extraction Cache\n")
+    print(f"Entries   : {s['entries']}")
+    print(f"Hits      : {s['hits']}")
+    print(f"Misses    : {s['misses']}")
+    print(f"Hit rate  : {s['hit_rate']}")
+    print(f"Stores    : {s['stores']}")
+    print(f"Evictions : {s['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import logging
+import threading
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+from imapclient import IMAPClient
+
+from src.config.config import IMAP_HOST, IMAP_PORT, IMAP_SSL, EMAIL_USER, EMAIL_PASS
+
+logger = logging.getLogger("imap_pool")
+
+
+class IMAPConnectionPool:
+    """
+    Bounded pool of authenticated IMAP connections.
+
+    - Connections are opened lazily, never more than `size` at once
+    - A connection that raised is discarded, not returned to the pool
+    - Callers block when all connections are checked out
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _open(self):
+        server = IMAPClient(IMAP_HOST, port=IMAP_PORT, ssl=IMAP_SSL)
+        server.login(EMAIL_USER, EMAIL_PASS)
+        with self._lock:
+            self._all.append(server)
+        return server
+
+    def _discard(self, server):
+        with self._lock:
+            if server in self._all:
+                self._all.remove(server)
+        try:
+            server.logout()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                server = self._idle.get_nowait()
+            except Empty:
+                server = self._open()
+
+            try:
+                yield server
+            except Exception:
+                self._discard(server)
+                raise
+            else:
+                self._idle.put(server)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            servers, self._all = self._all, []
+
+        for server in servers:
+            try:
+                server.logout()
+            except Exception:
+                logger.debug("IMAP logout failed", exc_info=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
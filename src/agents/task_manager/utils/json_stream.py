@@ -0,0 +1,129 @@
+import json
+
+
+class InvalidStream(ValueError):
+    """The model output can no longer become a valid task array."""
+
+
+class TaskArrayParser:
+    """
+    Incremental parser for the extraction output:
+    a JSON array of task objects, or the literal EMPTY.
+
+    feed() takes text chunks as the model emits them and returns the
+    task objects completed by that chunk. It raises InvalidStream as soon
+    as the output cannot be valid, so the caller can stop generation.
+
+    - `empty` is set once EMPTY is seen before the array
+    - `done` is set once the array is closed (or EMPTY was seen)
+    - A short preamble before the array or EMPTY (a ```json fence,
+      a sentence of prose) is tolerated
+    """
+
+    # Text allowed before "[" / EMPTY before the output is rejected
+    MAX_PREAMBLE_CHARS = 200
+
+    def __init__(self):
+        self.empty = False
+        self.done = False
+        self._preamble = ""
+        self._in_array = False
+        self._expect_item = True
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj = []
+
+    # ---------------- Preamble (before "[") ----------------
+
+    def _feed_preamble(self, text: str) -> str:
+        self._preamble += text
+        start = self._preamble.find("[")
+        head = self._preamble if start < 0 else self._preamble[:start]
+
+        # Models sometimes explain themselves first ("No actionable tasks.\nEMPTY")
+        if "EMPTY" in head:
+            self.empty = self.done = True
+            return ""
+
+        if start >= 0:
+            self._in_array = True
+            return self._preamble[start + 1:]
+
+        # Prose or a ``` fence so far; give up once it is clearly not a preamble
+        if len(head.strip()) > self.MAX_PREAMBLE_CHARS:
+            raise InvalidStream(f"Unexpected output start: {head.strip()[:40]!r}")
+
+        return ""
+
+    # ---------------- Array body ----------------
+
+    def feed(self, text: str) -> list:
+        if self.done:
+            return []
+
+        if not self._in_array:
+            text = self._feed_preamble(text)
+            if not self._in_array:
+                return []
+
+        tasks = []
+
+        for ch in text:
+            if self._depth == 0:
+                if ch.isspace():
+                    continue
+                if ch == "]":
+                    self.done = True
+                    break
+                if ch == "," and not self._expect_item:
+                    self._expect_item = True
+                    continue
+                if ch == "{" and self._expect_item:
+                    self._depth = 1
+                    self._obj = [ch]
+                    continue
+                raise InvalidStream(f"Unexpected {ch!r} in task array")
+
+            self._obj.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    tasks.append(self._close_object())
+
+        return tasks
+
+    def _close_object(self) -> dict:
+        raw = "".join(self._obj)
+        self._obj = []
+        self._expect_item = False
+
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise InvalidStream(f"Invalid task object: {raw[:80]!r}")
+
+    def close(self):
+        """
+        Call at end of stream; raises if the output was truncated.
+        No output at all counts as EMPTY.
+        """
+        if not self._in_array and not self._preamble.strip():
+            self.empty = self.done = True
+
+        if not self.done:
+            raise InvalidStream("Output ended before the task array was closed")
@@ -0,0 +1,259 @@
+import time
+import random
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.agents.task_manager.utils.rate_limit import TokenBucket
+from src.config.config import (
+    OLLAMA_URL,
+    LLM_CONCURRENCY,
+    LLM_RATE_PER_SEC,
+    LLM_BURST,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET_SECONDS,
+)
+
+logger = logging.getLogger("agent.task_manager.llm_client")
+
+
+class LLMUnavailable(RuntimeError):
+    """Ollama could not be reached (connection error / 5xx) after retries."""
+
+# =========================================================
+# Circuit Breaker
+# =========================================================
+
+class CircuitBreaker:
+    """
+    closed    → calls go through; consecutive failures are counted
+    open      → `failure_threshold` failures in a row; callers wait
+                `reset_seconds` instead of hammering a dead endpoint
+    half_open → one probe call is let through; its outcome closes
+                or re-opens the breaker
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._cond = threading.Condition()
+
+    @property
+    def is_open(self) -> bool:
+        with self._cond:
+            return self._current_state() == "open"
+
+    def _current_state(self) -> str:
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self.state = "half_open"
+        return self.state
+
+    def _reset_remaining(self) -> float:
+        return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def wait_ready(self):
+        """
+        Block until a call may be made (closed, or the half-open probe slot).
+        """
+        with self._cond:
+            while True:
+                state = self._current_state()
+                if state == "closed":
+                    return
+                if state == "half_open" and not self._probing:
+                    self._probing = True
+                    return
+                self._cond.wait(self._reset_remaining() or 1.0)
+
+    def wait_closed(self):
+        """
+        Block while open, without claiming the probe slot.
+        """
+        with self._cond:
+            while self._current_state() == "open":
+                self._cond.wait(self._reset_remaining() or 1.0)
+
+    def record_success(self):
+        with self._cond:
+            if self.state != "closed":
+                logger.info("✅ Ollama reachable again; resuming extraction")
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+            self._cond.notify_all()
+
+    def record_failure(self):
+        with self._cond:
+            self._failures += 1
+            probe_failed = self._probing
+            self._probing = False
+
+            if probe_failed or (
+                self.state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                logger.warning(
+                    "⏸️ Ollama unavailable (%d failure(s)); pausing extraction for %ss",
+                    self._failures,
+                    self.reset_seconds
+                )
+
+            self._cond.notify_all()
+
+    def release_probe(self):
+        """
+        The call neither proved nor disproved the endpoint (e.g. a read
+        timeout on a slow prompt): free the probe slot, keep the state.
+        """
+        with self._cond:
+            self._probing = False
+            self._cond.notify_all()
+
+    def trip(self):
+        """
+        Open the breaker now: a call exhausted its retries, so the
+        endpoint is down whatever the consecutive-failure count says.
+        """
+        with self._cond:
+            self._probing = False
+            if self.state != "open":
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                logger.warning(
+                    "⏸️ Ollama unavailable (retries exhausted); pausing extraction for %ss",
+                    self.reset_seconds
+                )
+            self._cond.notify_all()
+
+# =========================================================
+# Client
+# =========================================================
+
+class LLMClient:
+    """
+    Shared HTTP client for the Ollama endpoint.
+
+    - One keep-alive Session, connection pool sized for LLM_CONCURRENCY
+    - Every request (retries included) takes a token-bucket token
+      (`rate_per_sec`, `burst`), however many calls a job makes
+    - Connection errors and 5xx are retried with jittered exponential backoff
+    - A read timeout is the prompt's problem, not an outage: it is raised
+      as-is, without retrying or touching the breaker
+    - Every failure feeds the circuit breaker, and running out of retries
+      opens it; while it is open, calls block instead of failing
+      (extraction pauses, the backlog waits)
+    - 4xx and successful responses are returned to the caller as-is
+    """
+
+    def __init__(
+        self,
+        url: str = OLLAMA_URL,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        breaker: CircuitBreaker | None = None,
+        pool_size: int = LLM_CONCURRENCY,
+        rate_per_sec: float = LLM_RATE_PER_SEC,
+        burst: int = LLM_BURST,
+    ):
+        self.url = url
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker(
+            LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS
+        )
+        self.bucket = TokenBucket(rate_per_sec, burst)
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size) * 2)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform over [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def post(self, payload: dict, *, timeout: float, stream: bool = False):
+        """
+        POST `payload` to the endpoint.
+
+        Returns:
+            requests.Response (status < 500)
+
+        Raises:
+            LLMUnavailable: retries exhausted on connection errors / 5xx
+            requests.ReadTimeout: the endpoint answered too slowly
+        """
+        for attempt in range(self.max_retries + 1):
+            self.breaker.wait_ready()
+            self.bucket.acquire()
+
+            try:
+                response = self.session.post(
+                    self.url, json=payload, timeout=timeout, stream=stream
+                )
+            except requests.ReadTimeout:
+                self.breaker.release_probe()
+                raise
+            except requests.RequestException as exc:
+                # Any transport error, so a failed half-open probe
+                # always releases the probe slot
+                error = exc
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+
+                error = RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+                response.close()
+
+            self.breaker.record_failure()
+
+            if attempt < self.max_retries:
+                delay = self.backoff(attempt)
+                logger.warning(
+                    "Ollama call failed (%s); retry %d/%d in %.1fs",
+                    error,
+                    attempt + 1,
+                    self.max_retries,
+                    delay
+                )
+                time.sleep(delay)
+
+        self.breaker.trip()
+        raise LLMUnavailable(f"Ollama unavailable: {error}") from error
+
+    def close(self):
+        self.session.close()
+
+# =========================================================
+# Shared Client
+# =========================================================
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """
+    Process-wide client so every caller shares one session, breaker
+    and rate limit.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+
+    return _client
@@ -0,0 +1,117 @@
+import logging
+import threading
+
+from src.db import get_collection
+
+logger = logging.getLogger("llm_metrics")
+
+# =========================================================
+# DB Collections (owned here)
+# =========================================================
+
+metrics_col = get_collection("llm_tier_stats")
+
+# A call whose model load took longer than this counts as cold
+COLD_LOAD_SECONDS = 0.1
+
+# =========================================================
+# In-process Counters
+# =========================================================
+
+_lock = threading.Lock()
+
+# { tier: {calls, errors, seconds, prompt_chars, prompt_tokens, output_tokens, ...} }
+stats = {}
+
+
+def record(tier: str, model: str | None, seconds: float, **counts):
+    """
+    Account one LLM call (or outcome) against a cascade tier.
+    `counts` are added as-is (prompt_chars, output_tokens, positives, ...).
+    """
+    inc = {"calls": 1, "seconds": seconds}
+    inc.update({k: v for k, v in counts.items() if v})
+
+    # Warm / cold split needs Ollama's load_duration (absent on aborted streams)
+    if counts.get("load_seconds") is not None:
+        temp = "cold" if counts["load_seconds"] >= COLD_LOAD_SECONDS else "warm"
+        inc[f"{temp}_calls"] = 1
+        inc[f"{temp}_seconds"] = seconds
+
+    with _lock:
+        tier_stats = stats.setdefault(tier, {})
+        for field, value in inc.items():
+            tier_stats[field] = tier_stats.get(field, 0) + value
+
+    metrics_col.update_one(
+        {"_id": tier},
+        {"$inc": inc, "$set": {"model": model}},
+        upsert=True
+    )
+
+
+def count(tier: str, **counts):
+    """
+    Add outcome counters (no call) to a tier.
+    """
+    with _lock:
+        tier_stats = stats.setdefault(tier, {})
+        for field, value in counts.items():
+            tier_stats[field] = tier_stats.get(field, 0) + value
+
+    metrics_col.update_one({"_id": tier}, {"$inc": counts}, upsert=True)
+
+
+def _avg(doc: dict, total: str, calls: str):
+    n = doc.get(calls, 0)
+    return round(doc.get(total, 0) / n, 3) if n else None
+
+
+def tier_stats() -> list:
+    """
+    Lifetime per-tier totals (all processes).
+    """
+    rows = []
+    for doc in metrics_col.find().sort("_id", 1):
+        calls = doc.get("calls", 0)
+        rows.append({
+            "tier": doc["_id"],
+            "model": doc.get("model"),
+            "calls": calls,
+            "errors": doc.get("errors", 0),
+            "avg_seconds": round(doc.get("seconds", 0) / calls, 3) if calls else None,
+            "prompt_tokens": doc.get("prompt_tokens", 0),
+            "output_tokens": doc.get("output_tokens", 0),
+            "positives": doc.get("positives", 0),
+            "negatives": doc.get("negatives", 0),
+            "warm_calls": doc.get("warm_calls", 0),
+            "cold_calls": doc.get("cold_calls", 0),
+            "avg_warm_seconds": _avg(doc, "warm_seconds", "warm_calls"),
+            "avg_cold_seconds": _avg(doc, "cold_seconds", "cold_calls"),
+            "avg_prompt_eval_seconds": _avg(doc, "prompt_eval_seconds", "calls"),
+        })
+    return rows
+
+
+def main():
+    rows = tier_stats()
+
+    print("\n🧠 LLM Tier Metrics\n")
+    if not rows:
+        print("No LLM calls recorded yet.")
+        return
+
+    for row in rows:
+        print(f"[{row['tier']}] {row['model']}")
+        print(f"  Calls        : {row['calls']} ({row['errors']} failed)")
+        print(f"  Avg latency  : {row['avg_seconds']} s")
+        print(f"  Tokens       : {row['prompt_tokens']} in / {row['output_tokens']} out")
+        print(f"  Warm / cold  : {row['warm_calls']} @ {row['avg_warm_seconds']} s / "
+              f"{row['cold_calls']} @ {row['avg_cold_seconds']} s")
+        print(f"  Prompt eval  : {row['avg_prompt_eval_seconds']} s avg")
+        if row["positives"] or row["negatives"]:
+            print(f"  Actionable   : {row['positives']} yes / {row['negatives']} no")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+import re
+import sys
+import random
+import hashlib
+import argparse
+import logging
+from datetime import datetime
+
+from pymongo import UpdateOne, DeleteOne
+
+from src.db import get_collection, ensure_indexes
+from src.config.config import TASK_DEDUPE_ENABLED, TASK_DEDUPE_THRESHOLD
+from src.agents.task_manager.utils.task_id import normalize
+
+logger = logging.getLogger("agent.task_manager.task_dedupe")
+
+# =========================================================
+# Near-duplicate Tasks (MinHash + LSH)
+#
+# Each stored task carries `dedupe_bands`: LSH band keys of the MinHash
+# signature of its title words, scoped by owner. Two tasks sharing any
+# band key are candidates; the exact word Jaccard decides. Tasks of the
+# same email are never linked. A duplicate keeps its status and gets
+# duplicate_of=<canonical task_id>; the canonical task lists it in
+# `merged_from`.
+# =========================================================
+
+tasks_col = get_collection("tasks")
+edges_col = get_collection("event_cf_edges")
+
+WORD_RE = re.compile(r"\w+")
+
+# Filler words that rephrasings add or drop ("Send the Q1 report")
+STOPWORDS = frozenset({
+    "a", "an", "the", "to", "of", "for", "on", "in", "at", "by", "with",
+    "from", "and", "or", "our", "my", "your", "this", "that", "please",
+})
+
+# 16 bands x 4 rows: >99% chance to surface a pair at Jaccard 0.8
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+
+_MERSENNE_61 = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_61), _rng.randrange(0, _MERSENNE_61))
+    for _ in range(NUM_PERM)
+]
+
+# =========================================================
+# Signatures
+# =========================================================
+
+def shingles(title: str) -> set:
+    """
+    Title words minus stopwords: "Send Q1 report" and "Send Q2 report"
+    differ by a whole token, not by one character out of many.
+    """
+    words = set(WORD_RE.findall(normalize(title or "")))
+    return (words - STOPWORDS) or words
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def minhash(items: set) -> list:
+    hashes = [_hash(item) for item in items]
+    return [
+        min((a * h + b) % _MERSENNE_61 for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def band_keys(task) -> list:
+    """
+    LSH band keys for a task; only tasks with the same owner can collide.
+    """
+    items = shingles(task.get("title"))
+    if not items:
+        return []
+
+    owner = normalize(str(task.get("owner") or ""))
+    signature = minhash(items)
+
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(repr(rows).encode("utf-8"), digest_size=6).hexdigest()
+        keys.append(f"{owner}:{band}:{digest}")
+    return keys
+
+
+def similarity(a: str, b: str) -> float:
+    """
+    >>> similarity("Send the Q1 report", "Send Q1 report")
+    1.0
+    >>> similarity("Send Q1 report to Ramesh", "Send Q2 report to Ramesh") < TASK_DEDUPE_THRESHOLD
+    True
+    >>> similarity("Prepare invoice for Acme", "Prepare invoice for Beta Corp") < TASK_DEDUPE_THRESHOLD
+    True
+    """
+    sa, sb = shingles(a), shingles(b)
+    if not sa or not sb:
+        return 0.0
+    return len(sa & sb) / len(sa | sb)
+
+
+def find_canonical(task, candidates, threshold: float = TASK_DEDUPE_THRESHOLD):
+    """
+    Best matching candidate (highest similarity, then oldest), or None.
+    Tasks extracted from the same email are distinct by construction.
+    """
+    bands = set(task.get("dedupe_bands") or [])
+    best, best_score = None, threshold
+
+    for other in sorted(candidates, key=lambda t: str(t.get("created_at") or "")):
+        if other.get("task_id") == task.get("task_id"):
+            continue
+        if task.get("email_fingerprint") and other.get("email_fingerprint") == task.get("email_fingerprint"):
+            continue
+        if not bands & set(other.get("dedupe_bands") or []):
+            continue
+
+        score = similarity(task.get("title"), other.get("title"))
+        if score > best_score or (best is None and score == best_score):
+            best, best_score = other, score
+
+    return best
+
+# =========================================================
+# Linking
+# =========================================================
+
+# Candidates: OPEN tasks that are not themselves linked duplicates
+CANDIDATE_FILTER = {"status": "OPEN", "duplicate_of": None}
+CANDIDATE_FIELDS = {
+    "_id": 0, "task_id": 1, "title": 1, "owner": 1, "email_fingerprint": 1,
+    "dedupe_bands": 1, "created_at": 1,
+}
+
+
+def _merge_ops(duplicate_id: str, canonical_id: str, now: str) -> list:
+    return [
+        UpdateOne(
+            {"task_id": duplicate_id},
+            {"$set": {
+                "duplicate_of": canonical_id,
+                "merged_at": now,
+            }}
+        ),
+        UpdateOne(
+            {"task_id": canonical_id},
+            {
+                "$addToSet": {"merged_from": duplicate_id},
+                "$max": {"last_activity_at": now},
+            }
+        ),
+    ]
+
+
+def merge_new_tasks(tasks: list) -> dict:
+    """
+    Called by store_task for freshly inserted tasks (which already carry
+    `dedupe_bands`): link each near-duplicate of an OPEN task.
+
+    Returns:
+        dict: { duplicate task_id: canonical task_id }
+    """
+    if not TASK_DEDUPE_ENABLED or not tasks:
+        return {}
+
+    batch_ids = [task["task_id"] for task in tasks]
+    bands = sorted({key for task in tasks for key in task.get("dedupe_bands") or []})
+    if not bands:
+        return {}
+
+    # One round trip for all candidates of the batch
+    pool = list(tasks_col.find(
+        {"dedupe_bands": {"$in": bands}, **CANDIDATE_FILTER, "task_id": {"$nin": batch_ids}},
+        CANDIDATE_FIELDS
+    ))
+
+    merged = {}
+    for task in tasks:
+        canonical = find_canonical(task, pool)
+        if canonical is None:
+            # Later tasks of the same batch may duplicate this one
+            pool.append(task)
+            continue
+        merged[task["task_id"]] = canonical["task_id"]
+        logger.info(
+            "🧬 Task '%s' is a near-duplicate of '%s' (%s)",
+            task.get("title"),
+            canonical.get("title"),
+            canonical["task_id"]
+        )
+
+    if merged:
+        now = datetime.utcnow().isoformat()
+        ops = [op for dup, canon in merged.items() for op in _merge_ops(dup, canon, now)]
+        tasks_col.bulk_write(ops, ordered=False)
+
+        for task in tasks:
+            if task["task_id"] in merged:
+                task["duplicate_of"] = merged[task["task_id"]]
+
+    return merged
+
+# =========================================================
+# Batch Job (existing data)
+# =========================================================
+
+def dedupe_existing(apply: bool = False, threshold: float = TASK_DEDUPE_THRESHOLD) -> dict:
+    """
+    Backfill `dedupe_bands` on OPEN tasks and link near-duplicates,
+    oldest task first. CF edges of linked tasks move to the canonical
+    (an edge the canonical already has for that CF is dropped).
+
+    Returns:
+        dict: {scanned, backfilled, merged, pairs: [(dup, canonical, dup title, canonical title)]}
+    """
+    ensure_indexes()
+
+    buckets = {}
+    backfill = []
+    merges = []
+    stats = {"scanned": 0, "backfilled": 0, "merged": 0, "pairs": []}
+
+    cursor = tasks_col.find(
+        {**CANDIDATE_FILTER, "task_id": {"$nin": [None, ""]}},
+        CANDIDATE_FIELDS
+    ).sort("created_at", 1)
+
+    for task in cursor:
+        stats["scanned"] += 1
+
+        bands = band_keys(task)
+        if bands != task.get("dedupe_bands"):
+            task["dedupe_bands"] = bands
+            backfill.append(UpdateOne({"task_id": task["task_id"]}, {"$set": {"dedupe_bands": bands}}))
+
+        candidates = {id(c): c for key in bands for c in buckets.get(key, [])}
+        canonical = find_canonical(task, candidates.values(), threshold)
+
+        if canonical is not None:
+            merges.append((task["task_id"], canonical["task_id"]))
+            stats["pairs"].append((task["task_id"], canonical["task_id"], task["title"], canonical["title"]))
+            continue
+
+        for key in bands:
+            buckets.setdefault(key, []).append(task)
+
+    stats["backfilled"] = len(backfill)
+    stats["merged"] = len(merges)
+
+    if apply:
+        if backfill:
+            tasks_col.bulk_write(backfill, ordered=False)
+
+        if merges:
+            now = datetime.utcnow().isoformat()
+            ops = [op for dup, canon in merges for op in _merge_ops(dup, canon, now)]
+            tasks_col.bulk_write(ops, ordered=False)
+
+            edge_ops = _move_edge_ops(merges)
+            if edge_ops:
+                edges_col.bulk_write(edge_ops, ordered=False)
+
+    return stats
+
+
+def _move_edge_ops(merges: list) -> list:
+    """
+    Re-point each duplicate's CF edges at its canonical task, deleting
+    the ones that would repeat an (event_id, cf_id) pair.
+    """
+    task_ids = {task_id for pair in merges for task_id in pair}
+    edges = {}
+    for edge in edges_col.find({"event_id": {"$in": list(task_ids)}}, {"event_id": 1, "cf_id": 1}):
+        edges.setdefault(edge["event_id"], []).append(edge)
+
+    linked_cfs = {}
+    ops = []
+    for dup, canon in merges:
+        cfs = linked_cfs.setdefault(canon, {e.get("cf_id") for e in edges.get(canon, [])})
+        for edge in edges.get(dup, []):
+            if edge.get("cf_id") in cfs:
+                ops.append(DeleteOne({"_id": edge["_id"]}))
+            else:
+                cfs.add(edge.get("cf_id"))
+                ops.append(UpdateOne({"_id": edge["_id"]}, {"$set": {"event_id": canon}}))
+    return ops
+
+# =========================================================
+# CLI Entry
+# =========================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="workctl dedupe-tasks",
+        description="Find and link near-duplicate OPEN tasks (MinHash/LSH)"
+    )
+    parser.add_argument("--apply", action="store_true", help="Write links (default: dry run)")
+    parser.add_argument("--threshold", type=float, default=TASK_DEDUPE_THRESHOLD,
+                        help="Minimum title similarity (Jaccard of title words)")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+    stats = dedupe_existing(apply=args.apply, threshold=args.threshold)
+
+    print("\n🧬 Near-duplicate Tasks\n")
+    print(f"Scanned    : {stats['scanned']} OPEN task(s)")
+    print(f"Backfilled : {stats['backfilled']} signature(s)")
+    print(f"Duplicates : {stats['merged']}")
+
+    for dup, canon, dup_title, canon_title in stats["pairs"]:
+        print(f"  {dup} → {canon}")
+        print(f"    '{dup_title}' ≈ '{canon_title}'")
+
+    if stats["merged"] and not args.apply:
+        print("\n⚠️ DRY RUN — nothing linked (use --apply)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -10,10 +10,17 @@ def deterministic_hash(text: str, length=6) -> str:
     return h[:length].upper()
 
 
-def generate_task_id(project_id: str, verb: str, title: str) -> str:
+def generate_task_id(project_id: str, verb: str, title: str, source=None) -> str:
     """
     Deterministic task ID based on project + verb + task title.
+    `source` (e.g. the email fingerprint) keeps same-titled tasks from
+    different sources apart.
     """
     normalized_title = normalize(title)
-    h = deterministic_hash(normalized_title)
+    length = 6
+    if source is not None:
+        # Many more IDs per project/verb → longer hash to avoid collisions
+        normalized_title = f"{source}::{normalized_title}"
+        length = 10
+    h = deterministic_hash(normalized_title, length)
     return f"TASK::{project_id}::{verb.upper()}::{h}"
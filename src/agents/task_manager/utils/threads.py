@@ -0,0 +1,157 @@
+import re
+import hashlib
+import logging
+
+from src.db import get_collection
+from src.config.config import (
+    THREAD_CONTEXT_ENABLED,
+    THREAD_CONTEXT_MAX_TASKS,
+    THREAD_HISTORY_MESSAGES,
+)
+
+logger = logging.getLogger("agent.task_manager.threads")
+
+# =========================================================
+# DB Collections
+# =========================================================
+
+emails_col = get_collection("raw_emails")
+tasks_col = get_collection("tasks")
+
+MESSAGE_ID_RE = re.compile(r"<[^<>\s]+>")
+
+# =========================================================
+# Thread Assignment
+# =========================================================
+
+def normalize_message_id(value) -> str | None:
+    value = (value or "").strip().strip("<>").strip().lower()
+    return value or None
+
+
+def parse_message_ids(header: str | None) -> list:
+    """
+    "<a@x> <b@y>" → ["a@x", "b@y"] (order kept, duplicates dropped)
+    """
+    ids = []
+    for raw in MESSAGE_ID_RE.findall(header or ""):
+        mid = normalize_message_id(raw)
+        if mid and mid not in ids:
+            ids.append(mid)
+    return ids
+
+
+def assign_thread(email_doc):
+    """
+    Set email_doc["thread_id"] before the doc is persisted.
+
+    - References lists the thread root first → that is the thread id
+    - In-Reply-To only → the parent's thread (if ingested) or the parent
+    - Neither → the message starts its own thread
+    """
+    references = email_doc.get("references") or []
+    in_reply_to = email_doc.get("in_reply_to")
+
+    if references:
+        thread_id = references[0]
+    elif in_reply_to:
+        # Same basis as email_fingerprint() → served by the dedupe index
+        fingerprint = hashlib.sha256(f"mid:{in_reply_to}".encode("utf-8")).hexdigest()
+        parent = emails_col.find_one(
+            {"fingerprint": fingerprint, "canonical": True},
+            {"thread_id": 1}
+        )
+        thread_id = (parent or {}).get("thread_id") or in_reply_to
+    else:
+        thread_id = normalize_message_id(email_doc.get("message_id"))
+
+    email_doc["thread_id"] = thread_id
+    return email_doc
+
+# =========================================================
+# Delta + Context for Extraction
+# =========================================================
+
+def _paragraphs(text: str) -> list:
+    return [p for p in re.split(r"\n\s*\n", text or "") if p.strip()]
+
+
+def _norm(paragraph: str) -> str:
+    return " ".join(paragraph.lower().split())
+
+
+def message_delta(body: str, history: list) -> str:
+    """
+    Drop paragraphs that already appeared in earlier messages of the
+    thread (quoting styles prompt_body's markers don't catch).
+    """
+    seen = {_norm(p) for text in history for p in _paragraphs(text)}
+    if not seen:
+        return body
+
+    kept = [p for p in _paragraphs(body) if _norm(p) not in seen]
+    return "\n\n".join(kept) if kept else body
+
+
+def open_thread_tasks(thread_id: str, limit: int = THREAD_CONTEXT_MAX_TASKS) -> list:
+    return list(
+        tasks_col.find(
+            {"thread_id": thread_id, "status": "OPEN"},
+            {"_id": 0, "title": 1, "owner": 1, "due_by": 1}
+        )
+        .sort("last_activity_at", -1)
+        .limit(limit)
+    )
+
+
+def prepare(email):
+    """
+    Attach in-memory extraction hints to a reply (never persisted):
+
+    - email["thread_delta"]: body minus paragraphs seen earlier in the thread
+    - email["thread_tasks"]: open tasks already tracked for the thread
+
+    First messages of a thread are left untouched.
+    """
+    thread_id = email.get("thread_id")
+    if not THREAD_CONTEXT_ENABLED or not thread_id:
+        return email
+    if thread_id == normalize_message_id(email.get("message_id")):
+        return email
+
+    query = {"thread_id": thread_id, "canonical": True}
+    if email.get("_id") is not None:
+        query["_id"] = {"$ne": email["_id"]}
+    if email.get("received_at"):
+        query["received_at"] = {"$lt": email["received_at"]}
+
+    history = [
+        doc.get("prompt_body") or doc.get("body") or ""
+        for doc in emails_col.find(query, {"prompt_body": 1, "body": 1})
+        .sort("received_at", -1)
+        .limit(THREAD_HISTORY_MESSAGES)
+    ]
+
+    body = email.get("prompt_body") or email.get("body") or ""
+    email["thread_delta"] = message_delta(body, history)
+    email["thread_tasks"] = open_thread_tasks(thread_id)
+
+    return email
+
+
+def format_thread_tasks(tasks: list) -> str:
+    lines = []
+    for task in tasks:
+        details = ", ".join(
+            str(v) for v in (task.get("owner"), task.get("due_by")) if v
+        )
+        lines.append(f"- {task.get('title')}" + (f" ({details})" if details else ""))
+    return "\n".join(lines)
+
+
+def drop_known_tasks(tasks: list, thread_tasks: list) -> list:
+    """
+    Belt and braces: discard tasks whose title matches an open thread task.
+    """
+    known = {_norm(t.get("title") or "") for t in thread_tasks or []}
+    return [t for t in tasks if _norm(t.get("title") or "") not in known]
@@ -0,0 +1,295 @@
+import re
+import sys
+import argparse
+import logging
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+from src.db import get_collection
+from src.config.config import TRIAGE_ENABLED, TRIAGE_RULES_FILE
+
+logger = logging.getLogger("agent.task_manager.triage")
+
+# =========================================================
+# Configuration
+# =========================================================
+
+DEFAULT_RULES_FILE = Path(__file__).resolve().parents[3] / "config" / "triage_rules.yaml"
+
+ACTIONS = ("process", "skip", "defer")
+
+MATCH_KEYS = ("header_present", "header_regex", "from_regex", "subject_regex")
+
+# =========================================================
+# DB Collections
+# =========================================================
+
+emails_col = get_collection("raw_emails")
+
+# =========================================================
+# Rules
+# =========================================================
+
+_rules = None
+_rules_lock = threading.Lock()
+
+
+def _compile_rule(idx: int, rule: dict) -> dict:
+    name = rule.get("name") or f"rule_{idx}"
+    action = rule.get("action")
+    match = rule.get("match") or {}
+
+    if action not in ACTIONS:
+        raise ValueError(f"Triage rule '{name}': action must be one of {ACTIONS}")
+    if not match or set(match) - set(MATCH_KEYS):
+        raise ValueError(f"Triage rule '{name}': match needs keys from {MATCH_KEYS}")
+
+    def regexes(patterns):
+        return [re.compile(p, re.IGNORECASE) for p in patterns or []]
+
+    return {
+        "name": name,
+        "action": action,
+        "reason": rule.get("reason") or name.upper(),
+        "header_present": [h.lower() for h in match.get("header_present") or []],
+        "header_regex": {
+            h.lower(): re.compile(p, re.IGNORECASE)
+            for h, p in (match.get("header_regex") or {}).items()
+        },
+        "from_regex": regexes(match.get("from_regex")),
+        "subject_regex": regexes(match.get("subject_regex")),
+    }
+
+
+def load_rules(path=None) -> list:
+    """
+    Load and compile triage rules (cached after the first call).
+
+    Returns:
+        list[dict]: compiled rules, in evaluation order
+    """
+    global _rules
+
+    with _rules_lock:
+        if _rules is not None and path is None:
+            return _rules
+
+        rules_file = Path(path or TRIAGE_RULES_FILE or DEFAULT_RULES_FILE)
+        if not rules_file.exists():
+            raise FileNotFoundError(f"Triage rules not found: {rules_file}")
+
+        with open(rules_file, "r") as f:
+            data = yaml.safe_load(f) or {}
+
+        rules = data.get("rules") or []
+        if not isinstance(rules, list):
+            raise ValueError("Invalid triage_rules.yaml format")
+
+        compiled = [_compile_rule(idx, rule) for idx, rule in enumerate(rules)]
+        if path is None:
+            _rules = compiled
+
+        return compiled
+
+# =========================================================
+# Matching
+# =========================================================
+
+def _sender_addresses(email) -> list:
+    addresses = []
+    for entry in email.get("from") or []:
+        # pyzmail gives (name, address) pairs
+        address = entry[1] if isinstance(entry, (list, tuple)) else entry
+        if address:
+            addresses.append(str(address).strip().lower())
+    return addresses
+
+
+def _matches(rule: dict, email) -> bool:
+    headers = email.get("headers") or {}
+
+    if rule["header_present"] and not any(headers.get(h) for h in rule["header_present"]):
+        return False
+
+    for header, regex in rule["header_regex"].items():
+        if not regex.search(headers.get(header) or ""):
+            return False
+
+    if rule["from_regex"]:
+        senders = _sender_addresses(email)
+        if not any(r.search(s) for r in rule["from_regex"] for s in senders):
+            return False
+
+    if rule["subject_regex"]:
+        subject = (email.get("subject") or "").strip()
+        if not any(r.search(subject) for r in rule["subject_regex"]):
+            return False
+
+    return True
+
+
+def classify(email, rules=None) -> dict:
+    """
+    Deterministic triage decision for one email_doc. No DB access.
+
+    Returns:
+        dict: {action, reason, rule, decided_at}
+    """
+    for rule in rules if rules is not None else load_rules():
+        if _matches(rule, email):
+            action, reason, name = rule["action"], rule["reason"], rule["name"]
+            break
+    else:
+        action, reason, name = "process", "NO_RULE_MATCHED", None
+
+    return {
+        "action": action,
+        "reason": reason,
+        "rule": name,
+        "decided_at": datetime.now(timezone.utc),
+    }
+
+
+def annotate(email_doc):
+    """
+    Attach the triage decision before the doc is persisted,
+    so recording it costs no extra write.
+    """
+    if TRIAGE_ENABLED:
+        email_doc["triage"] = classify(email_doc)
+    return email_doc
+
+# =========================================================
+# Pipeline Gate
+# =========================================================
+
+def triage_email(email):
+    """
+    Decision for an email about to be extracted. Emails persisted
+    without one (triage disabled at the time, older docs) are
+    classified now and the decision is written back to raw_emails.
+
+    Returns:
+        dict | None: None when triage is disabled
+    """
+    if not TRIAGE_ENABLED:
+        return None
+
+    decision = email.get("triage")
+    if decision:
+        return decision
+
+    decision = classify(email)
+    email["triage"] = decision
+
+    if email.get("_id") is not None:
+        emails_col.update_one({"_id": email["_id"]}, {"$set": {"triage": decision}})
+
+    return decision
+
+
+def should_extract(email) -> bool:
+    decision = triage_email(email)
+    if not decision or decision["action"] == "process":
+        return True
+
+    logger.info(
+        "🚦 Triage %s email UID=%s (%s)",
+        decision["action"],
+        email.get("uid"),
+        decision["reason"]
+    )
+    return False
+
+# =========================================================
+# Reporting / Deferred Mail
+# =========================================================
+
+def triage_report() -> list:
+    """
+    Returns:
+        list[dict]: [{action, reason, count}] over canonical raw_emails
+    """
+    rows = emails_col.aggregate([
+        {"$match": {"canonical": True, "triage": {"$exists": True}}},
+        {"$group": {
+            "_id": {"action": "$triage.action", "reason": "$triage.reason"},
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"count": -1}}
+    ])
+
+    return [
+        {"action": row["_id"]["action"], "reason": row["_id"]["reason"], "count": row["count"]}
+        for row in rows
+    ]
+
+
+def release_deferred(limit: int | None = None) -> int:
+    """
+    Extract deferred emails now. Their triage decision becomes
+    action=process, reason=RELEASED.
+
+    Returns:
+        int: number of emails released
+    """
+    from src.agents.task_manager.agent import process_email
+
+    cursor = emails_col.find(
+        {"canonical": True, "triage.action": "defer"}
+    ).sort("received_at", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    released = 0
+    for email in cursor:
+        decision = {
+            **email["triage"],
+            "action": "process",
+            "reason": "RELEASED",
+            "deferred_reason": email["triage"].get("reason"),
+            "decided_at": datetime.now(timezone.utc),
+        }
+        emails_col.update_one({"_id": email["_id"]}, {"$set": {"triage": decision}})
+        email["triage"] = decision
+
+        process_email(email)
+        released += 1
+
+    return released
+
+# =========================================================
+# CLI Entry
+# =========================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="workctl triage",
+        description="Show pre-LLM triage decisions; optionally extract deferred mail"
+    )
+    parser.add_argument("--release", action="store_true", help="Extract deferred emails now")
+    parser.add_argument("--limit", type=int, help="Release at most N emails")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+    if args.release:
+        released = release_deferred(args.limit)
+        print(f"\n✅ Released {released} deferred email(s)")
+        return
+
+    rows = triage_report()
+
+    print("\n🚦 Email Triage\n")
+    if not rows:
+        print("No triage decisions recorded yet.")
+        return
+
+    for row in rows:
+        print(f"{row['action']:<8} {row['reason']:<24} {row['count']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
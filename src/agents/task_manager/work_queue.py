@@ -0,0 +1,307 @@
+import os
+import sys
+import socket
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+from pymongo import ReturnDocument
+
+from src.db import get_collection, ensure_indexes
+from src.config.config import (
+    WORK_QUEUE_ENABLED,
+    WORK_QUEUE_WORKERS,
+    WORK_LEASE_SECONDS,
+    WORK_MAX_ATTEMPTS,
+    WORK_RETRY_BACKOFF_SECONDS,
+)
+
+logger = logging.getLogger("agent.task_manager.work_queue")
+
+# =========================================================
+# Work Queue over raw_emails
+#
+# Each canonical email fetched while WORK_QUEUE_ENABLED carries:
+#
+#   work: {
+#     state:            pending | leased | done | failed
+#     attempts:         claims so far
+#     available_at:     not claimable before this (retry backoff)
+#     lease_owner:      "<host>:<pid>:<thread>" while leased
+#     lease_expires_at: an expired lease is claimable again
+#     last_error:       str | None
+#   }
+#
+# Claims are a single find_one_and_update, so any number of agent
+# processes (on any host) can drain the queue without double work.
+# =========================================================
+
+STATES = ("pending", "leased", "done", "failed")
+
+emails_col = get_collection("raw_emails")
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def annotate(email_doc):
+    """
+    Mark a freshly fetched email as pending work (before it is persisted).
+    """
+    if WORK_QUEUE_ENABLED:
+        email_doc["work"] = {
+            "state": "pending",
+            "attempts": 0,
+            "available_at": _now(),
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "last_error": None,
+        }
+    return email_doc
+
+# =========================================================
+# Queue Operations
+# =========================================================
+
+def fail_expired(now: datetime | None = None) -> int:
+    """
+    Expired leases that already used WORK_MAX_ATTEMPTS claims (e.g. the
+    worker crashed every time) are failed instead of claimed again.
+    """
+    now = now or _now()
+    result = emails_col.update_many(
+        {
+            "work.state": "leased",
+            "work.lease_expires_at": {"$lt": now},
+            "work.attempts": {"$gte": WORK_MAX_ATTEMPTS},
+        },
+        {"$set": {
+            "work.state": "failed",
+            "work.lease_owner": None,
+            "work.lease_expires_at": None,
+            "work.last_error": "lease expired",
+        }}
+    )
+    return result.modified_count
+
+
+def claim(owner: str, lease_seconds: float = WORK_LEASE_SECONDS):
+    """
+    Lease the oldest claimable email.
+
+    Returns:
+        dict | None: the raw_emails doc, or None if nothing is claimable
+    """
+    now = _now()
+    fail_expired(now)
+
+    return emails_col.find_one_and_update(
+        {
+            "$or": [
+                {"work.state": "pending", "work.available_at": {"$lte": now}},
+                {
+                    "work.state": "leased",
+                    "work.lease_expires_at": {"$lt": now},
+                    "work.attempts": {"$lt": WORK_MAX_ATTEMPTS},
+                },
+            ]
+        },
+        {
+            "$set": {
+                "work.state": "leased",
+                "work.lease_owner": owner,
+                "work.lease_expires_at": now + timedelta(seconds=lease_seconds),
+            },
+            "$inc": {"work.attempts": 1}
+        },
+        sort=[("received_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def renew(email_id, owner: str, lease_seconds: float = WORK_LEASE_SECONDS) -> bool:
+    result = emails_col.update_one(
+        {"_id": email_id, "work.state": "leased", "work.lease_owner": owner},
+        {"$set": {"work.lease_expires_at": _now() + timedelta(seconds=lease_seconds)}}
+    )
+    return result.modified_count == 1
+
+
+def complete(email_id, owner: str) -> bool:
+    """
+    Returns:
+        bool: False if the lease was lost (another worker owns it now)
+    """
+    result = emails_col.update_one(
+        {"_id": email_id, "work.state": "leased", "work.lease_owner": owner},
+        {"$set": {
+            "work.state": "done",
+            "work.lease_owner": None,
+            "work.lease_expires_at": None,
+            "work.last_error": None,
+            "work.done_at": _now(),
+        }}
+    )
+    return result.modified_count == 1
+
+
+def fail(email_doc, owner: str, error) -> str:
+    """
+    Release a lease after an error: back to pending with exponential
+    backoff, or failed once WORK_MAX_ATTEMPTS is reached.
+
+    Returns:
+        str: the new state
+    """
+    attempts = email_doc["work"]["attempts"]
+    exhausted = attempts >= WORK_MAX_ATTEMPTS
+    state = "failed" if exhausted else "pending"
+    delay = WORK_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+
+    emails_col.update_one(
+        {"_id": email_doc["_id"], "work.state": "leased", "work.lease_owner": owner},
+        {"$set": {
+            "work.state": state,
+            "work.available_at": _now() + timedelta(seconds=delay),
+            "work.lease_owner": None,
+            "work.lease_expires_at": None,
+            "work.last_error": str(error)[:500],
+        }}
+    )
+    return state
+
+
+def retry_failed() -> int:
+    result = emails_col.update_many(
+        {"work.state": "failed"},
+        {"$set": {"work.state": "pending", "work.attempts": 0, "work.available_at": _now()}}
+    )
+    return result.modified_count
+
+
+def queue_counts() -> dict:
+    counts = {state: 0 for state in STATES}
+    for row in emails_col.aggregate([
+        {"$match": {"work": {"$exists": True}}},
+        {"$group": {"_id": "$work.state", "count": {"$sum": 1}}}
+    ]):
+        counts[row["_id"]] = row["count"]
+    return counts
+
+# =========================================================
+# Workers
+# =========================================================
+
+def process_leased(email):
+    """
+    Extract → store → CF for one leased email. Unlike process_email(),
+    any failure is raised so the lease can be retried.
+    """
+    from src.agents.task_manager.pipeline import extract_stage, store_stage, cf_stage
+
+    for item in extract_stage(email):
+        for stored in store_stage(item):
+            cf_stage(stored)
+
+
+def _heartbeat(email_id, owner: str, stop: threading.Event):
+    # Long extractions (or an Ollama outage) must not lose the lease
+    while not stop.wait(WORK_LEASE_SECONDS / 3):
+        if not renew(email_id, owner):
+            return
+
+
+def process_next(owner: str | None = None) -> bool:
+    """
+    Claim and process one email.
+
+    Returns:
+        bool: False when nothing was claimable
+    """
+    owner = owner or worker_id()
+    email = claim(owner)
+    if email is None:
+        return False
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat, args=(email["_id"], owner, stop), daemon=True
+    )
+    heartbeat.start()
+
+    try:
+        process_leased(email)
+    except Exception as exc:
+        state = fail(email, owner, exc)
+        logger.exception(
+            "❌ Work item UID=%s failed (attempt %d, now %s)",
+            email.get("uid"),
+            email["work"]["attempts"],
+            state
+        )
+    else:
+        if not complete(email["_id"], owner):
+            logger.warning("⚠️ Lease lost before completing UID=%s", email.get("uid"))
+    finally:
+        stop.set()
+        heartbeat.join()
+
+    return True
+
+
+def _drain_worker() -> int:
+    owner = worker_id()
+    processed = 0
+    while process_next(owner):
+        processed += 1
+    return processed
+
+
+def drain(workers: int = WORK_QUEUE_WORKERS) -> int:
+    """
+    Process claimable work with `workers` threads until none is left.
+
+    Returns:
+        int: items processed (done or failed)
+    """
+    ensure_indexes()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="work") as pool:
+        return sum(pool.map(lambda _: _drain_worker(), range(max(1, workers))))
+
+# =========================================================
+# CLI Entry
+# =========================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="workctl work-queue",
+        description="Inspect or drain the email extraction work queue"
+    )
+    parser.add_argument("--drain", action="store_true", help="Process pending work, then exit")
+    parser.add_argument("--workers", type=int, default=WORK_QUEUE_WORKERS)
+    parser.add_argument("--retry-failed", action="store_true", help="Reset failed items to pending")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+    if args.retry_failed:
+        print(f"🔁 Reset {retry_failed()} failed item(s) to pending")
+
+    if args.drain:
+        print(f"⚙️ Processed {drain(args.workers)} item(s)")
+
+    counts = queue_counts()
+
+    print("\n📬 Extraction Work Queue\n")
+    for state in STATES:
+        print(f"{state:<8} {counts[state]}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,6 +2,13 @@ from src.agents.task_manager.record_decisions import main as record_decision
 from src.agents.task_manager.generate_markdown import main as generate_markdown
 from src.agents.task_manager.pomodoro import main as pomodoro_main
 from src.agents.task_manager.agent import main as email_task_creator
+from src.agents.task_manager.mail_importer import main as import_mail
+from src.agents.task_manager.utils.extraction_cache import main as llm_cache_stats
+from src.agents.task_manager.utils.llm_metrics import main as llm_tier_stats
+from src.agents.task_manager.utils.triage import main as triage_main
+from src.agents.task_manager.work_queue import main as work_queue_main
+from src.db import indexes_main as db_indexes
+from src.agents.task_manager.utils.task_dedupe import main as dedupe_tasks
 from src.agents.task_manager.priority_view import get_priority_task
 from src.agents.judgement.morning_brief import morning_judgement_brief
 from src.cli.open_email import open_email
@@ -45,6 +52,41 @@ COMMAND_ROUTES = {
         "help": "Read emails and create tasks automatically"
     },
 
+    "import-mail": {
+        "handler": import_mail,
+        "help": "Backfill emails/tasks from an mbox or Maildir export"
+    },
+
+    "llm-cache": {
+        "handler": llm_cache_stats,
+        "help": "Show LLM extraction cache size and hit/miss counters"
+    },
+
+    "llm-stats": {
+        "handler": llm_tier_stats,
+        "help": "Show per-tier LLM latency, token and cascade counters"
+    },
+
+    "triage": {
+        "handler": triage_main,
+        "help": "Show pre-LLM triage decisions (--release to extract deferred mail)"
+    },
+
+    "work-queue": {
+        "handler": work_queue_main,
+        "help": "Show extraction work queue (--drain to process, --retry-failed)"
+    },
+
+    "db-indexes": {
+        "handler": db_indexes,
+        "help": "Audit MongoDB indexes (--ensure to create, --explain for query plans)"
+    },
+
+    "dedupe-tasks": {
+        "handler": dedupe_tasks,
+        "help": "Find near-duplicate OPEN tasks (--apply to link them)"
+    },
+
     # ========= PRIORITY VIEW =========
     "priority": {
         "handler": get_priority_task,
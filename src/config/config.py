@@ -5,12 +5,69 @@ load_dotenv()
 
 # IMAP
 IMAP_HOST = os.getenv("IMAP_HOST")
+IMAP_PORT = int(os.getenv("IMAP_PORT")) if os.getenv("IMAP_PORT") else None
+IMAP_SSL = os.getenv("IMAP_SSL", "true").lower() != "false"
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
+IMAP_POOL_SIZE = int(os.getenv("IMAP_POOL_SIZE", 4))
 
 # Ollama
 OLLAMA_URL = os.getenv("OLLAMA_URL")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL")
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 60))
+# Model cascade: a small classifier model screens emails and only
+# actionable ones (score >= CASCADE_THRESHOLD) reach OLLAMA_MODEL.
+# Unset OLLAMA_CLASSIFIER_MODEL to send everything to OLLAMA_MODEL.
+OLLAMA_CLASSIFIER_MODEL = os.getenv("OLLAMA_CLASSIFIER_MODEL")
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", 0.5))
+CASCADE_CLASSIFIER_TIMEOUT = float(os.getenv("CASCADE_CLASSIFIER_TIMEOUT", 15))
+# How long Ollama keeps a model loaded after a call ("30m", "1h", "-1" = forever).
+# The static prompt prefix is warmed once per load and reused across emails.
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Stream generations so EMPTY / malformed output is cut off early
+OLLAMA_STREAM = os.getenv("OLLAMA_STREAM", "true").lower() != "false"
+
+# LLM extraction pool: concurrent requests, and request starts/sec (0 = unlimited)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 2))
+LLM_RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", 0))
+LLM_BURST = int(os.getenv("LLM_BURST", 2))
+
+# Ollama HTTP client: retries with jittered backoff, then a circuit
+# breaker that pauses extraction while the endpoint is down
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", 0.5))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", 10))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+# Outages an extraction waits out before its email is failed
+LLM_OUTAGE_MAX_WAITS = int(os.getenv("LLM_OUTAGE_MAX_WAITS", 3))
+
+# Batched prompting: several short emails per LLM call
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", 3000))
+LLM_BATCH_MAX_EMAILS = int(os.getenv("LLM_BATCH_MAX_EMAILS", 8))
+LLM_BATCH_SHORT_EMAIL_TOKENS = int(os.getenv("LLM_BATCH_SHORT_EMAIL_TOKENS", 600))
+
+# Email body sent to the LLM (after quote/signature/disclaimer stripping)
+PROMPT_BODY_MAX_TOKENS = int(os.getenv("PROMPT_BODY_MAX_TOKENS", 1000))
+
+# Thread-aware extraction: replies send only their new text, with the
+# thread's open tasks as context so they are not extracted again
+THREAD_CONTEXT_ENABLED = os.getenv("THREAD_CONTEXT_ENABLED", "true").lower() != "false"
+THREAD_CONTEXT_MAX_TASKS = int(os.getenv("THREAD_CONTEXT_MAX_TASKS", 10))
+THREAD_HISTORY_MESSAGES = int(os.getenv("THREAD_HISTORY_MESSAGES", 5))
+
+# Near-duplicate task linking (MinHash/LSH over title words + owner)
+TASK_DEDUPE_ENABLED = os.getenv("TASK_DEDUPE_ENABLED", "true").lower() != "false"
+TASK_DEDUPE_THRESHOLD = float(os.getenv("TASK_DEDUPE_THRESHOLD", 0.8))
+
+# Persistent cache of LLM extraction results
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50000))
+LLM_CACHE_MAX_AGE_DAYS = int(os.getenv("LLM_CACHE_MAX_AGE_DAYS", 90))
+
+# Pre-LLM triage of newsletters / auto-replies / notifications
+TRIAGE_ENABLED = os.getenv("TRIAGE_ENABLED", "true").lower() != "false"
+TRIAGE_RULES_FILE = os.getenv("TRIAGE_RULES_FILE")  # default: src/config/triage_rules.yaml
 
 # MongoDB
 MONGO_USER = os.getenv("MONGO_USER")
@@ -22,3 +79,24 @@ DB_NAME = os.getenv("DB_NAME")
 EMAIL_POLL_SECONDS = int(os.getenv("EMAIL_POLL_SECONDS", 60))
 EMAIL_SLEEP_TIME__IN_HOURS = 2
 POMODORO_MINUTES = 25
+
+# Email ingestion mode: "poll" (sleep loop) or "idle" (IMAP IDLE push)
+EMAIL_INGEST_MODE = os.getenv("EMAIL_INGEST_MODE", "poll")
+IMAP_IDLE_FOLDERS = [
+    f.strip() for f in os.getenv("IMAP_IDLE_FOLDERS", "INBOX").split(",") if f.strip()
+]
+
+# Processing: "serial" (one email at a time), "pipelined" or "batched"
+# (short emails share one LLM prompt)
+EMAIL_PIPELINE = os.getenv("EMAIL_PIPELINE", "serial")
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 20))
+PIPELINE_EXTRACT_WORKERS = int(os.getenv("PIPELINE_EXTRACT_WORKERS", 2))
+PIPELINE_STORE_WORKERS = int(os.getenv("PIPELINE_STORE_WORKERS", 2))
+PIPELINE_CF_WORKERS = int(os.getenv("PIPELINE_CF_WORKERS", 1))
+
+# Durable work queue over raw_emails (crash-safe, multi-process)
+WORK_QUEUE_ENABLED = os.getenv("WORK_QUEUE_ENABLED", "false").lower() == "true"
+WORK_QUEUE_WORKERS = int(os.getenv("WORK_QUEUE_WORKERS", 2))
+WORK_LEASE_SECONDS = float(os.getenv("WORK_LEASE_SECONDS", 300))
+WORK_MAX_ATTEMPTS = int(os.getenv("WORK_MAX_ATTEMPTS", 5))
+WORK_RETRY_BACKOFF_SECONDS = float(os.getenv("WORK_RETRY_BACKOFF_SECONDS", 30))
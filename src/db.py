@@ -1,12 +1,22 @@
-from pymongo import MongoClient
+import sys
+import json
+import logging
+import argparse
+import threading
+
+from pymongo import MongoClient, IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 from src.config.config import (
     MONGO_USER,
     MONGO_PASS,
     MONGO_HOST,
     MONGO_PORT,
-    DB_NAME
+    DB_NAME,
+    LLM_CACHE_MAX_AGE_DAYS,
 )
 
+logger = logging.getLogger("db")
+
 # ---------------- Mongo Connection ----------------
 
 MONGO_URI = (
@@ -48,3 +58,314 @@ def update_last_uid(uid: int):
         {"$set": {"last_uid": uid}},
         upsert=True
     )
+
+# ---------------- Index Specs ----------------
+# Single source of truth for every index the code relies on.
+# Modules never call create_index themselves; they call ensure_indexes().
+
+INDEX_SPECS = {
+    "tasks": [
+        IndexModel([("task_id", ASCENDING)], name="task_id"),
+        IndexModel([("status", ASCENDING), ("last_activity_at", DESCENDING)], name="status_activity"),
+        # Identity of a stored email task (store_task upserts on it).
+        # Partial: pomodoro / manual tasks have neither field, and tasks
+        # stored before email_fingerprint existed are matched by
+        # task_legacy_identity instead.
+        IndexModel(
+            [("email_fingerprint", ASCENDING), ("title_key", ASCENDING)],
+            name="task_email_identity",
+            unique=True,
+            partialFilterExpression={"source": "email", "email_fingerprint": {"$exists": True}}
+        ),
+        IndexModel([("email_uid", ASCENDING), ("title", ASCENDING)], name="task_legacy_identity"),
+        IndexModel(
+            [("thread_id", ASCENDING), ("status", ASCENDING), ("last_activity_at", DESCENDING)],
+            name="thread_open_tasks",
+            sparse=True
+        ),
+        # LSH band keys of near-duplicate candidates (multikey)
+        IndexModel(
+            [("dedupe_bands", ASCENDING)],
+            name="dedupe_bands",
+            partialFilterExpression={"status": "OPEN"}
+        ),
+    ],
+    "event_cf_edges": [
+        IndexModel([("event_id", ASCENDING)], name="event_id"),
+        IndexModel([("cf_id", ASCENDING)], name="cf_id"),
+    ],
+    "context_fingerprints": [
+        IndexModel([("cf_id", ASCENDING)], name="cf_id"),
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    "raw_emails": [
+        # One canonical doc per fingerprint, enforced by the server so
+        # parallel folder workers cannot race each other
+        IndexModel(
+            [("fingerprint", ASCENDING)],
+            name="fingerprint_canonical_unique",
+            unique=True,
+            partialFilterExpression={"canonical": True}
+        ),
+        IndexModel([("uid", ASCENDING)], name="uid"),
+        IndexModel([("folder", ASCENDING), ("received_at", DESCENDING)], name="folder_received"),
+        IndexModel([("thread_id", ASCENDING), ("received_at", DESCENDING)], name="thread_received"),
+        IndexModel(
+            [("work.state", ASCENDING), ("work.available_at", ASCENDING)],
+            name="work_queue",
+            partialFilterExpression={"work": {"$exists": True}}
+        ),
+    ],
+    "email_sync_state": [
+        IndexModel([("folder", ASCENDING)], name="folder", unique=True),
+    ],
+    "decisions": [
+        IndexModel([("timestamp", ASCENDING)], name="timestamp"),
+    ],
+    "llm_extraction_cache": [
+        # Age-based eviction is left to Mongo's TTL monitor
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=LLM_CACHE_MAX_AGE_DAYS * 86400
+        ),
+        IndexModel([("last_used_at", ASCENDING)], name="last_used_at"),
+    ],
+}
+
+# Representative hot queries: (collection, filter, sort, expected index)
+HOT_QUERIES = [
+    ("tasks", {"task_id": "TASK-x"}, None, "task_id"),
+    ("tasks", {"status": "OPEN", "duplicate_of": None}, None, "status_activity"),
+    ("tasks", {"source": "email", "email_fingerprint": "x", "title_key": "x"}, None, "task_email_identity"),
+    ("tasks", {"source": "email", "email_uid": 1, "title": "x", "email_subject": "x", "email_from": "x", "email_fingerprint": {"$exists": False}}, None, "task_legacy_identity"),
+    ("tasks", {"thread_id": "x", "status": "OPEN"}, [("last_activity_at", -1)], "thread_open_tasks"),
+    ("tasks", {"dedupe_bands": {"$in": ["x"]}, "status": "OPEN"}, None, "dedupe_bands"),
+    ("event_cf_edges", {"event_id": "TASK-x"}, None, "event_id"),
+    ("event_cf_edges", {"cf_id": "CF-x"}, None, "cf_id"),
+    ("context_fingerprints", {"status": "active"}, None, "status"),
+    ("context_fingerprints", {"cf_id": {"$in": ["CF-x"]}}, None, "cf_id"),
+    ("raw_emails", {"uid": 1}, None, "uid"),
+    ("raw_emails", {"folder": "INBOX", "received_at": {"$ne": None}}, [("received_at", -1)], "folder_received"),
+    ("raw_emails", {"thread_id": "x", "canonical": True}, [("received_at", -1)], "thread_received"),
+    ("email_sync_state", {"folder": "INBOX"}, None, "folder"),
+    ("decisions", {}, [("timestamp", 1)], "timestamp"),
+]
+
+# Superseded indexes, dropped by ensure_indexes() before INDEX_SPECS
+# are created (a stale unique index would keep rejecting writes)
+RETIRED_INDEXES = {
+    # Unique (email_uid, title): UIDs are folder-local → task_email_identity
+    "tasks": ["task_identity"],
+}
+
+# IndexOptionsConflict: same keys/name, different options (e.g. a new TTL)
+INDEX_OPTIONS_CONFLICT = 85
+
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+def ensure_indexes(force: bool = False) -> dict:
+    """
+    Create every index in INDEX_SPECS (idempotent; once per process
+    unless `force`) after dropping RETIRED_INDEXES. A changed TTL is
+    applied in place with collMod.
+
+    Returns:
+        dict: { collection: {name: error} } for indexes that could not
+              be created (e.g. duplicates blocking a unique index)
+    """
+    global _indexes_ready
+
+    with _indexes_lock:
+        if _indexes_ready and not force:
+            return {}
+
+        failed = {}
+        for collection, names in RETIRED_INDEXES.items():
+            col = get_collection(collection)
+            for name in set(names) & set(col.index_information()):
+                col.drop_index(name)
+                logger.info("🗑️ Dropped retired index %s.%s", collection, name)
+
+        for collection, models in INDEX_SPECS.items():
+            col = get_collection(collection)
+            for model in models:
+                spec = model.document
+                try:
+                    col.create_indexes([model])
+                except OperationFailure as exc:
+                    if exc.code == INDEX_OPTIONS_CONFLICT and "expireAfterSeconds" in spec:
+                        get_db().command(
+                            "collMod",
+                            collection,
+                            index={"name": spec["name"], "expireAfterSeconds": spec["expireAfterSeconds"]}
+                        )
+                        continue
+
+                    failed.setdefault(collection, {})[spec["name"]] = str(exc)
+                    logger.warning(
+                        "⚠️ Could not create index %s.%s: %s",
+                        collection,
+                        spec["name"],
+                        exc
+                    )
+
+        _indexes_ready = True
+        return failed
+
+
+def _key_list(key) -> list:
+    return [(field, direction) for field, direction in dict(key).items()]
+
+
+def _is_plain(info: dict) -> bool:
+    # Unique / partial / TTL / sparse indexes do more than speed up reads
+    return not any(
+        opt in info
+        for opt in ("unique", "partialFilterExpression", "expireAfterSeconds", "sparse")
+    )
+
+
+def index_report() -> dict:
+    """
+    Compare live indexes with INDEX_SPECS.
+
+    Returns:
+        dict: { collection: {
+                  missing:    declared but absent,
+                  undeclared: present but not in INDEX_SPECS,
+                  redundant:  [(name, covered_by)] key prefix of another index,
+                  unused:     [(name, since)] no $indexStats accesses (None if unavailable)
+              } }
+    """
+    report = {}
+
+    for collection in sorted(set(INDEX_SPECS) | set(get_db().list_collection_names())):
+        col = get_collection(collection)
+        live = {
+            name: info for name, info in col.index_information().items()
+            if name != "_id_"
+        }
+        declared = [model.document["name"] for model in INDEX_SPECS.get(collection, [])]
+
+        redundant = []
+        for name, info in live.items():
+            keys = _key_list(info["key"])
+            for other, other_info in live.items():
+                other_keys = _key_list(other_info["key"])
+                if other != name and _is_plain(info) and other_keys[:len(keys)] == keys:
+                    redundant.append((name, other))
+                    break
+
+        try:
+            unused = [
+                (row["name"], row["accesses"]["since"])
+                for row in col.aggregate([{"$indexStats": {}}])
+                if row["name"] != "_id_" and not row["accesses"]["ops"]
+            ]
+        except OperationFailure:
+            unused = None
+
+        entry = {
+            "missing": [name for name in declared if name not in live],
+            "undeclared": [name for name in live if name not in declared],
+            "redundant": redundant,
+            "unused": unused,
+        }
+        if any(entry.values()) or collection in INDEX_SPECS:
+            report[collection] = entry
+
+    return report
+
+
+def _plan_stages(plan: dict) -> list:
+    # Classic and SBE (queryPlan) explain shapes
+    plan = plan.get("queryPlan", plan)
+    stages = [plan]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages.extend(_plan_stages(child))
+    return stages
+
+
+def explain_query(collection: str, filter: dict, sort=None, projection=None) -> dict:
+    """
+    Winning plan summary of a find(), for checking index usage.
+
+    Returns:
+        dict: {indexes, stages, collscan, keys_examined, docs_examined, returned}
+    """
+    cursor = get_collection(collection).find(filter, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+
+    plan = cursor.explain()
+    stages = _plan_stages(plan["queryPlanner"]["winningPlan"])
+    execution = plan.get("executionStats", {})
+
+    return {
+        "indexes": [s["indexName"] for s in stages if s.get("indexName")],
+        "stages": [s.get("stage") for s in stages],
+        "collscan": any(s.get("stage") == "COLLSCAN" for s in stages),
+        "keys_examined": execution.get("totalKeysExamined"),
+        "docs_examined": execution.get("totalDocsExamined"),
+        "returned": execution.get("nReturned"),
+    }
+
+
+def assert_uses_index(collection: str, filter: dict, index: str, sort=None):
+    """
+    Explain-plan check for tests: fail unless the query is served by `index`.
+    """
+    summary = explain_query(collection, filter, sort=sort)
+    if index not in summary["indexes"]:
+        raise AssertionError(
+            f"{collection}.find({filter!r}) used {summary['indexes'] or 'no index'} "
+            f"({', '.join(summary['stages'])}), expected {index}"
+        )
+    return summary
+
+
+def indexes_main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="workctl db-indexes",
+        description="Ensure and audit the declared MongoDB indexes"
+    )
+    parser.add_argument("--ensure", action="store_true", help="Create missing indexes first")
+    parser.add_argument("--explain", action="store_true", help="Check the hot queries' plans")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+    if args.ensure:
+        failed = ensure_indexes(force=True)
+        print(f"🧱 Indexes ensured ({sum(len(v) for v in failed.values())} failed)")
+
+    report = index_report()
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, default=str)
+        print()
+    else:
+        print("\n🗂️ MongoDB Indexes\n")
+        for collection, entry in report.items():
+            problems = [
+                f"missing {', '.join(entry['missing'])}" if entry["missing"] else "",
+                f"undeclared {', '.join(entry['undeclared'])}" if entry["undeclared"] else "",
+                ", ".join(f"{n} redundant with {o}" for n, o in entry["redundant"]),
+                f"unused {', '.join(n for n, _ in entry['unused'])}" if entry["unused"] else "",
+            ]
+            problems = [p for p in problems if p]
+            print(f"{'⚠️' if problems else '✅'} {collection}: {'; '.join(problems) or 'ok'}")
+
+    if args.explain:
+        print("\n🔎 Hot query plans\n")
+        for collection, filter, sort, expected in HOT_QUERIES:
+            summary = explain_query(collection, filter, sort=sort)
+            ok = expected in summary["indexes"]
+            print(
+                f"{'✅' if ok else '❌'} {collection} {json.dumps(filter, default=str)} → "
+                f"{', '.join(summary['indexes']) or 'COLLSCAN'}"
+            )
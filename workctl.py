@@ -56,7 +56,8 @@ def main():
         help="Command to run"
     )
 
-    args = parser.parse_args()
+    # Unknown args are left in sys.argv for the command handler
+    args, _ = parser.parse_known_args()
 
     # =====================================================
     # SHORTCUT RESOLUTION (highest priority)